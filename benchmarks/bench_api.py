@@ -0,0 +1,331 @@
+"""End-to-end API load benchmark with a JSON baseline.
+
+Seeds users and contacts, then drives the main endpoints through the real
+FastAPI app (middleware, auth, cache, database) at a fixed concurrency and
+reports latency percentiles, throughput and SQL statements per request.
+
+By default it runs against a temporary SQLite file and an in-process
+fakeredis, which is enough to catch regressions in query counts and Python
+overhead. Pass --db-url/--redis-url to run against real services; point them
+at a disposable, migrated database, since the bench_* users are replaced:
+
+    python -m benchmarks.bench_api --users 20 --contacts 200 --requests 500
+    python -m benchmarks.bench_api --output baseline.json
+    python -m benchmarks.bench_api --baseline baseline.json --max-regression 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+PASSWORD = "bench-password"
+
+
+def configure(args) -> None:
+    # settings are read at import time, so this runs before any src import
+    os.environ["DB_URL"] = args.db_url
+    os.environ["DB_REPLICA_URLS"] = "[]"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["SQL_PROFILING_ENABLED"] = "false"
+    for name, value in (
+        ("MAIL_USERNAME", "bench"),
+        ("MAIL_PASSWORD", "bench"),
+        ("MAIL_FROM", "bench@example.com"),
+        ("MAIL_PORT", "25"),
+        ("MAIL_SERVER", "localhost"),
+    ):
+        os.environ.setdefault(name, value)
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+        return
+
+    import fakeredis
+
+    import src.database.redis_client as redis_module
+
+    class FakeInstrumentedRedis(
+        redis_module.InstrumentedRedis, fakeredis.FakeAsyncRedis
+    ):
+        pass
+
+    redis_module.redis_client = FakeInstrumentedRedis()
+
+
+async def seed(session_manager, users: int, contacts: int, sqlite: bool) -> list[str]:
+    import bcrypt
+    from sqlalchemy import delete, insert, select
+
+    from src.models.models_contacts import Base, Contact, RefreshToken, User
+
+    if sqlite:
+        async with session_manager._engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt()).decode()
+    usernames = [f"bench_{i}" for i in range(users)]
+    # spread birthdays over the year starting from today
+    first_day = date(1990, 1, 1)
+    day_of_year = date.today().timetuple().tm_yday - 1
+    async with session_manager.session() as session:
+        bench_users = select(User.id).where(User.username.like("bench\\_%", "\\"))
+        await session.execute(
+            delete(RefreshToken).where(RefreshToken.user_id.in_(bench_users))
+        )
+        await session.execute(delete(Contact).where(Contact.user_id.in_(bench_users)))
+        await session.execute(delete(User).where(User.id.in_(bench_users)))
+        user_ids = (
+            await session.scalars(
+                insert(User)
+                .values(
+                    [
+                        {
+                            "username": name,
+                            "email": f"{name}@bench.example.com",
+                            "hash_password": hashed,
+                            "confirmed": True,
+                        }
+                        for name in usernames
+                    ]
+                )
+                .returning(User.id)
+            )
+        ).all()
+        for user_id in user_ids:
+            await session.execute(
+                insert(Contact),
+                [
+                    {
+                        "first_name": f"First{i % 50}",
+                        "last_name": f"Last{i}",
+                        "email": f"u{user_id}c{i}@bench.example.com",
+                        "phone": f"+3{user_id:04d}{i:07d}",
+                        "birthday": first_day + timedelta(days=(day_of_year + i) % 365),
+                        "user_id": user_id,
+                    }
+                    for i in range(contacts)
+                ],
+            )
+        await session.commit()
+    return usernames
+
+
+def query_totals(method: str, route: str) -> tuple[float, float]:
+    from prometheus_client import REGISTRY
+
+    labels = {"method": method, "route": route}
+    return (
+        REGISTRY.get_sample_value("db_queries_per_request_sum", labels) or 0.0,
+        REGISTRY.get_sample_value("db_queries_per_request_count", labels) or 0.0,
+    )
+
+
+async def drive(client, scenario, tokens: dict[str, str], requests: int, args):
+    name, method, route, build = scenario
+    queries_before, count_before = query_totals(method, route)
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        rng = random.Random()
+        for _ in remaining:
+            username = rng.choice(list(tokens))
+            kwargs = build(username, tokens[username], rng, args)
+            started = time.perf_counter()
+            response = await client.request(method, kwargs.pop("url"), **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    queries_after, count_after = query_totals(method, route)
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return name, {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(0.50), 2),
+            "p95": round(percentile(0.95), 2),
+            "p99": round(percentile(0.99), 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2),
+        },
+        "queries_per_request": round(
+            (queries_after - queries_before) / max(count_after - count_before, 1), 2
+        ),
+    }
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+SCENARIOS = [
+    (
+        "login",
+        "POST",
+        "/api/auth/login",
+        lambda user, token, rng, args: {
+            "url": "/api/auth/login",
+            "data": {"username": user, "password": PASSWORD},
+        },
+    ),
+    (
+        "contacts_list",
+        "GET",
+        "/api/contacts/",
+        lambda user, token, rng, args: {
+            "url": "/api/contacts/?limit=50"
+            f"&offset={rng.randrange(0, max(args.contacts - 50, 0) + 1, 50)}",
+            "headers": auth(token),
+        },
+    ),
+    (
+        "contacts_search",
+        "GET",
+        "/api/contacts/search/",
+        lambda user, token, rng, args: {
+            "url": f"/api/contacts/search/?first_name=First{rng.randrange(50)}",
+            "headers": auth(token),
+        },
+    ),
+    (
+        "contacts_birthday",
+        "GET",
+        "/api/contacts/birthday/",
+        lambda user, token, rng, args: {
+            "url": "/api/contacts/birthday/?days=7",
+            "headers": auth(token),
+        },
+    ),
+    (
+        "users_me",
+        "GET",
+        "/api/users/me",
+        lambda user, token, rng, args: {"url": "/api/users/me", "headers": auth(token)},
+    ),
+]
+
+
+async def run(args) -> dict:
+    import httpx
+
+    import main
+    from src.database.db import session_manager
+
+    usernames = await seed(
+        session_manager, args.users, args.contacts, args.db_url.startswith("sqlite")
+    )
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            tokens = {}
+            for username in usernames:
+                response = await client.post(
+                    "/api/auth/login",
+                    data={"username": username, "password": PASSWORD},
+                )
+                response.raise_for_status()
+                tokens[username] = response.json()["access_token"]
+
+            results = {}
+            for scenario in SCENARIOS:
+                if args.only and scenario[0] not in args.only:
+                    continue
+                # login is bound by bcrypt, so fewer requests keep runs short
+                requests = (
+                    max(args.requests // 10, 1)
+                    if scenario[0] == "login"
+                    else args.requests
+                )
+                name, result = await drive(client, scenario, tokens, requests, args)
+                results[name] = result
+
+    return {
+        "config": {
+            "users": args.users,
+            "contacts_per_user": args.contacts,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "database": args.db_url.split("://", 1)[0],
+            "redis": "redis" if args.redis_url else "fakeredis",
+        },
+        "scenarios": results,
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    failures = []
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for metric in ("p95", "p99"):
+            old, new = before["latency_ms"][metric], result["latency_ms"][metric]
+            if old and new > old * (1 + max_regression):
+                failures.append(f"{name} {metric}: {old} ms -> {new} ms")
+        # cache hit ratios shift a little between runs; an extra statement
+        # on every request is what this is meant to catch
+        if result["queries_per_request"] > before["queries_per_request"] + 0.5:
+            failures.append(
+                f"{name} queries/request: {before['queries_per_request']}"
+                f" -> {result['queries_per_request']}"
+            )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--contacts", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--db-url")
+    parser.add_argument("--redis-url")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    workdir = None
+    if not args.db_url:
+        workdir = tempfile.TemporaryDirectory(prefix="bench-api-")
+        args.db_url = f"sqlite+aiosqlite:///{workdir.name}/bench.db"
+    configure(args)
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(report, json.load(f), args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
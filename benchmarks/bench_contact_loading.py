@@ -0,0 +1,79 @@
+"""Compare contact row materialization with and without the joined User load.
+
+Runs against an in-memory SQLite database, so it only measures the ORM side
+(row construction and identity-map work), not network or planner costs:
+
+    python -m benchmarks.bench_contact_loading --contacts 5000 --page 100
+"""
+
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, joinedload, load_only
+
+from src.controlllers.contacts_controllers import RESPONSE_COLUMNS, SEARCH_COLUMNS
+from src.models.models_contacts import Base, Contact, User
+
+
+def seed(session: Session, contacts: int) -> User:
+    user = User(username="bench", email="bench@example.com", hash_password="x")
+    session.add(user)
+    session.flush()
+    session.add_all(
+        Contact(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone=f"+380{i:09d}",
+            birthday=date(1990, 1 + i % 12, 1 + i % 28),
+            additional_data="bench",
+            user_id=user.id,
+        )
+        for i in range(contacts)
+    )
+    session.commit()
+    return user
+
+
+def run(session: Session, stmt, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        session.execute(stmt).unique().scalars().all()
+        session.expunge_all()
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=5000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = seed(session, args.contacts)
+        page = select(Contact).filter_by(user_id=user.id).order_by(Contact.id)
+        page = page.limit(args.page)
+        search = select(Contact).where(
+            Contact.user_id == user.id, SEARCH_COLUMNS[1].like("%Last1%")
+        )
+        cases = {
+            "list": page,
+            "search": search,
+        }
+        print(f"{'query':<8} {'joined user':>14} {'load_only':>14} {'speedup':>8}")
+        for name, stmt in cases.items():
+            joined = run(session, stmt.options(joinedload(Contact.user)), args.rounds)
+            lean = run(session, stmt.options(load_only(*RESPONSE_COLUMNS)), args.rounds)
+            print(
+                f"{name:<8} {joined * 1000:>11.3f} ms {lean * 1000:>11.3f} ms "
+                f"{joined / lean:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
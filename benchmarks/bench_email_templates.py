@@ -0,0 +1,71 @@
+"""Micro-benchmark of per-message email rendering cost.
+
+python -m benchmarks.bench_email_templates --messages 5000
+"""
+
+import argparse
+import time
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from src.services.email_templates import TEMPLATE_FOLDER, EmailTemplates
+
+TEMPLATE = "verify_email.html"
+
+
+def contexts(count: int) -> list[dict]:
+    return [
+        {"username": f"user{i}", "token": f"token-{i}", "host": "http://localhost/"}
+        for i in range(count)
+    ]
+
+
+def per_message_environment(batch: list[dict]) -> None:
+    # What the app did before: a fresh loader/environment for every send.
+    for context in batch:
+        env = Environment(
+            loader=FileSystemLoader(TEMPLATE_FOLDER),
+            autoescape=select_autoescape(["html"]),
+        )
+        env.get_template(TEMPLATE).render(context)
+
+
+def cached_jinja_template(batch: list[dict]) -> None:
+    template = TEMPLATES.templates[TEMPLATE].template
+    for context in batch:
+        template.render(context)
+
+
+def precompiled(batch: list[dict]) -> None:
+    for context in batch:
+        TEMPLATES.render(TEMPLATE, **context)
+
+
+def render_many(batch: list[dict]) -> None:
+    TEMPLATES.render_many(TEMPLATE, batch)
+
+
+TEMPLATES = EmailTemplates()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    batch = contexts(args.messages)
+    print(f"{'strategy':<26} {'us/message':>11}")
+    for runner in (
+        per_message_environment,
+        cached_jinja_template,
+        precompiled,
+        render_many,
+    ):
+        started = time.perf_counter()
+        runner(batch)
+        elapsed = time.perf_counter() - started
+        print(f"{runner.__name__:<26} {elapsed / args.messages * 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
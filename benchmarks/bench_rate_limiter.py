@@ -0,0 +1,88 @@
+"""Per-request overhead of the Redis rate limiter.
+
+Times RateLimiter.check for anonymous and authenticated requests. Runs against
+--redis-url when given, otherwise against an in-process fakeredis (whose Lua
+runtime is much slower than Redis, so treat those numbers as an upper bound):
+
+    python -m benchmarks.bench_rate_limiter --requests 2000
+    python -m benchmarks.bench_rate_limiter --redis-url redis://localhost
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import jwt
+from starlette.requests import Request
+
+from src.conf.config import settings
+from src.core.rate_limiter import RateLimit, RateLimiter
+
+
+def make_request(path: str, token: str | None) -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": b"",
+            "headers": headers,
+            "client": ("10.0.0.1", 50000),
+            "server": ("testserver", 80),
+            "scheme": "http",
+        }
+    )
+
+
+async def measure(limiter: RateLimiter, request: Request, count: int) -> list[float]:
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await limiter.check(request)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run(args) -> None:
+    if args.redis_url:
+        import redis.asyncio as redis
+
+        client = redis.from_url(args.redis_url)
+    else:
+        import fakeredis
+
+        client = fakeredis.FakeAsyncRedis()
+
+    # large enough that no request is rejected during the run
+    limit = RateLimit(capacity=args.requests * 10, period=1)
+    limiter = RateLimiter(limits={"default": limit}, groups=[], client=client)
+    token = jwt.encode(
+        {"sub": "bench"}, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+
+    print(f"{'case':<14} {'p50 us':>9} {'p99 us':>9} {'mean us':>9}")
+    for name, request in (
+        ("anonymous", make_request("/api/contacts/", None)),
+        ("authenticated", make_request("/api/contacts/", token)),
+    ):
+        await measure(limiter, request, min(100, args.requests))
+        timings = sorted(await measure(limiter, request, args.requests))
+        p50 = timings[len(timings) // 2] * 1e6
+        p99 = timings[int(len(timings) * 0.99) - 1] * 1e6
+        mean = statistics.fmean(timings) * 1e6
+        print(f"{name:<14} {p50:>9.1f} {p99:>9.1f} {mean:>9.1f}")
+
+    await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--redis-url")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Compare per-page serialization of contact lists.
+
+Measures the path from an executed query to the response body bytes, on an
+in-memory SQLite database:
+
+- orm: load Contact objects, validate them through ContactResponseSchema and
+  encode, which is what a response_model route does
+- rows: select plain columns, zip them into dicts and encode with orjson
+
+and, for a page already in the cache, validating and re-encoding the cached
+JSON against splitting the stored page entry into body and next-page id:
+
+    python -m benchmarks.bench_serialization --contacts 2000 --page 100
+"""
+
+import argparse
+import time
+from datetime import date
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, load_only
+
+from src.controlllers.contacts_controllers import RESPONSE_COLUMNS, _as_dicts
+from src.core.serialization import dump_json
+from src.models.models_contacts import Base, Contact, User
+from src.schemas.contact_schemas import ContactResponseSchema
+
+contact_list_adapter = TypeAdapter(list[ContactResponseSchema])
+
+
+def seed(session: Session, contacts: int) -> User:
+    user = User(username="bench", email="bench@example.com", hash_password="x")
+    session.add(user)
+    session.flush()
+    session.add_all(
+        Contact(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone=f"+380{i:09d}",
+            birthday=date(1990, 1 + i % 12, 1 + i % 28),
+            additional_data="bench",
+            user_id=user.id,
+        )
+        for i in range(contacts)
+    )
+    session.commit()
+    return user
+
+
+def timed(fn, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = seed(session, args.contacts)
+        orm_stmt = (
+            select(Contact)
+            .options(load_only(*RESPONSE_COLUMNS))
+            .filter_by(user_id=user.id)
+            .order_by(Contact.id)
+            .limit(args.page)
+        )
+        row_stmt = (
+            select(*RESPONSE_COLUMNS)
+            .where(Contact.user_id == user.id)
+            .order_by(Contact.id)
+            .limit(args.page)
+        )
+
+        def orm_path() -> bytes:
+            contacts = session.execute(orm_stmt).scalars().all()
+            session.expunge_all()
+            return contact_list_adapter.dump_json(
+                contact_list_adapter.validate_python(contacts, from_attributes=True)
+            )
+
+        def row_path() -> bytes:
+            return dump_json(_as_dicts(session.execute(row_stmt)))
+
+        cached = row_path()
+        entry = b"%d\n" % args.page + cached
+        if orjson.loads(cached) != orjson.loads(orm_path()):
+            raise SystemExit("row and ORM paths produce different payloads")
+
+        cases = {
+            "query": (orm_path, row_path),
+            "cache hit": (
+                lambda: contact_list_adapter.dump_json(
+                    contact_list_adapter.validate_json(cached)
+                ),
+                lambda: entry.partition(b"\n"),
+            ),
+        }
+        print(f"page of {args.page} contacts, {len(cached)} bytes")
+        print(f"{'path':<10} {'validated':>14} {'fast path':>14} {'speedup':>8}")
+        for name, (slow, fast) in cases.items():
+            before = timed(slow, args.rounds)
+            after = timed(fast, args.rounds)
+            print(
+                f"{name:<10} {before * 1000:>11.3f} ms {after * 1000:>11.3f} ms "
+                f"{before / after:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
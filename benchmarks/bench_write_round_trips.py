@@ -0,0 +1,131 @@
+"""Count SQL statements and time per contact write, before and after RETURNING.
+
+"before" replays the old select/commit/refresh flow; "after" calls the
+current ContactController. Uses a temporary SQLite file through aiosqlite:
+
+    python -m benchmarks.bench_write_round_trips --rounds 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.controlllers.contacts_controllers import ContactController
+from src.models.models_contacts import Base, Contact, User
+from src.schemas.contact_schemas import ContactSchema, ContactUpdateSchema
+
+
+def payload(i: int) -> ContactSchema:
+    return ContactSchema(
+        first_name=f"First{i}",
+        last_name=f"Last{i}",
+        email=f"contact{i}@example.com",
+        phone=f"+380{i:09d}",
+        birthday=date(1990, 1 + i % 12, 1 + i % 28),
+    )
+
+
+class LegacyContactController:
+    def __init__(self, db):
+        self.db = db
+
+    async def get_contact_by_id(self, contact_id, user):
+        stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
+        return (await self.db.execute(stmt)).scalar_one_or_none()
+
+    async def create_contact(self, contact, user):
+        new_contact = Contact(**contact.model_dump(), user_id=user.id)
+        self.db.add(new_contact)
+        await self.db.commit()
+        await self.db.refresh(new_contact)
+        return new_contact
+
+    async def update_contact(self, contact_id, contact, user):
+        db_contact = await self.get_contact_by_id(contact_id, user)
+        for key, value in contact.model_dump(exclude_unset=True).items():
+            setattr(db_contact, key, value)
+        await self.db.commit()
+        await self.db.refresh(db_contact)
+        return db_contact
+
+    async def remove_contact(self, contact_id, user):
+        contact = await self.get_contact_by_id(contact_id, user)
+        await self.db.delete(contact)
+        await self.db.commit()
+
+
+ids: dict[int, int] = {}
+
+
+async def measure(session_maker, controller_cls, user, rounds, offset, statements):
+    results = {}
+    for op in ("create", "update", "delete"):
+        before = len(statements)
+        started = time.perf_counter()
+        for i in range(offset, offset + rounds):
+            async with session_maker() as session:
+                controller = controller_cls(session)
+                if op == "create":
+                    contact = await controller.create_contact(payload(i), user)
+                    ids[i] = contact.id
+                elif op == "update":
+                    update = ContactUpdateSchema(first_name=f"Renamed{i}")
+                    await controller.update_contact(ids[i], update, user)
+                else:
+                    await controller.remove_contact(ids[i], user)
+        elapsed = time.perf_counter() - started
+        results[op] = ((len(statements) - before) / rounds, elapsed / rounds)
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    statements: list[str] = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *rest: statements.append(statement),
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    legacy_sessions = async_sessionmaker(bind=engine, autoflush=False)
+    sessions = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    async with sessions() as session:
+        user = User(username="bench", email="bench@example.com", hash_password="x")
+        session.add(user)
+        await session.commit()
+        user = SimpleNamespace(id=user.id)
+
+    before = await measure(
+        legacy_sessions, LegacyContactController, user, args.rounds, 0, statements
+    )
+    after = await measure(
+        sessions, ContactController, user, args.rounds, args.rounds, statements
+    )
+    await engine.dispose()
+
+    print(
+        f"{'op':<8} {'queries before':>15} {'queries after':>14} {'ms before':>10} {'ms after':>9}"
+    )
+    for op in before:
+        print(
+            f"{op:<8} {before[op][0]:>15.1f} {after[op][0]:>14.1f} "
+            f"{before[op][1] * 1000:>10.3f} {after[op][1] * 1000:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
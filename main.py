@@ -1,37 +1,40 @@
-from datetime import datetime, timedelta, timezone
+import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, status, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi.errors import RateLimitExceeded
 from fastapi.responses import JSONResponse
-from sqlalchemy import text
+from fastapi.staticfiles import StaticFiles
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from src.conf.config import settings
+from src.core.metrics import metrics_endpoint, metrics_middleware, register_stats
+from src.core.password_hasher import password_hasher
+from src.core.rate_limiter import rate_limiter
+from src.core.sql_profiler import sql_profiler
 from src.database.db import session_manager
 from src.routers import contacts_routes, user_routes, auth_routes
+from src.services.token_cleanup_service import cleanup_expired_tokens
+from src.services.token_revocation_service import token_revocation
+from src.services.upload_file_service import upload_file_service
 
 scheduler = AsyncIOScheduler()
 
 
-async def cleanup_expired_tokens():
-    async with session_manager() as session:
-        time_now = datetime.now(timezone.utc)
-        cutoff = time_now - timedelta(days=7)
-        stmt = text(
-            "DELETE FROM refresh_tokens WHERE expired_at < :time_now OR revoked_at IS NOT NULL AND revoked_at < :cutoff"
-        )
-        await session.execute(stmt, {"time_now": time_now, "cutoff": cutoff})
-        await session.commit()
-        print(f"Cleaned up expired tokens [{time_now.strftime('%Y-%m-%d %H:%M:%S')}]")
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    scheduler.add_job(cleanup_expired_tokens, "interval", hours=1)
+    scheduler.add_job(
+        cleanup_expired_tokens,
+        "interval",
+        minutes=settings.TOKEN_CLEANUP_INTERVAL_MINUTES,
+    )
     scheduler.start()
+    token_revocation.start()
     yield
+    await token_revocation.stop()
     scheduler.shutdown()
+    password_hasher.shutdown()
+    await session_manager.close()
 
 
 app = FastAPI(
@@ -42,13 +45,41 @@ app = FastAPI(
 )
 
 
-@app.exception_handler(RateLimitExceeded)
-async def rate_limit_exception_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-        content={"detail": "Rate limit exceeded"},
-    )
-
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    if not settings.RATE_LIMIT_ENABLED:
+        return await call_next(request)
+    rejected = await rate_limiter.check(request)
+    if rejected is not None:
+        return rejected
+    response = await call_next(request)
+    limit = getattr(request.state, "rate_limit", None)
+    if limit:
+        response.headers["X-RateLimit-Limit"] = str(limit[0])
+        response.headers["X-RateLimit-Remaining"] = str(limit[1])
+    return response
+
+
+@app.middleware("http")
+async def avatar_size_limit(request: Request, call_next):
+    # FastAPI reads the form before any dependency runs, so the declared size
+    # is checked here to refuse oversized uploads before they are received
+    if request.method == "POST" and request.url.path == "/api/users/avatar":
+        try:
+            upload_file_service.check_content_length(
+                request.headers.get("content-length")
+            )
+        except HTTPException as e:
+            return JSONResponse({"detail": e.detail}, status_code=e.status_code)
+    return await call_next(request)
+
+
+# registered after the limiter so that it wraps it and sees rejected requests
+app.middleware("http")(metrics_middleware)
+
+if settings.SQL_PROFILING_ENABLED:
+    sql_profiler.install()
+    app.middleware("http")(sql_profiler.middleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -62,6 +93,37 @@ app.include_router(contacts_routes.router, prefix="/api")
 app.include_router(user_routes.router, prefix="/api")
 app.include_router(auth_routes.router, prefix="/api")
 
+if settings.AVATAR_STORAGE == "local":
+    os.makedirs(settings.AVATAR_LOCAL_DIR, exist_ok=True)
+    app.mount(
+        settings.AVATAR_LOCAL_BASE_URL,
+        StaticFiles(directory=settings.AVATAR_LOCAL_DIR),
+        name="avatars",
+    )
+
+
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+register_stats(
+    "password_hash_pool",
+    password_hasher.metrics,
+    counters=("completed", "rejected", "wait_seconds_total", "run_seconds_total"),
+)
+register_stats(
+    "db_pool",
+    session_manager.pool_metrics,
+    counters=("checkouts", "wait_seconds_total"),
+)
+register_stats(
+    "rate_limiter",
+    rate_limiter.metrics,
+    counters=("checked", "rejected", "errors", "seconds_total"),
+)
+register_stats(
+    "token_revocation",
+    token_revocation.metrics,
+    counters=("checks", "redis_lookups", "false_positives"),
+)
+
 
 @app.get("/")
 async def read_root():
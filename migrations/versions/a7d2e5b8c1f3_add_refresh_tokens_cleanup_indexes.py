@@ -0,0 +1,41 @@
+"""Add refresh_tokens cleanup indexes
+
+Revision ID: a7d2e5b8c1f3
+Revises: 5c8b0e3d9f21
+Create Date: 2026-10-18 15:02:41.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e5b8c1f3'
+down_revision: Union[str, None] = '5c8b0e3d9f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_refresh_tokens_expired_at',
+        'refresh_tokens',
+        ['expired_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_refresh_tokens_revoked_at',
+        'refresh_tokens',
+        ['revoked_at'],
+        unique=False,
+        postgresql_where=sa.text('revoked_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refresh_tokens_revoked_at', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_expired_at', table_name='refresh_tokens')
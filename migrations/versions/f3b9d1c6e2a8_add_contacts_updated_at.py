@@ -0,0 +1,36 @@
+"""Add contacts updated_at
+
+Revision ID: f3b9d1c6e2a8
+Revises: a7d2e5b8c1f3
+Create Date: 2026-10-18 16:24:07.118352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d1c6e2a8'
+down_revision: Union[str, None] = 'a7d2e5b8c1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'contacts',
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contacts', 'updated_at')
@@ -1,3 +1,4 @@
 NAME_MIN_LENGTH = 3
 NAME_MAX_LENGTH = 100
 MAX_PHONE_LENGTH = 15
+BATCH_MAX_ITEMS = 500
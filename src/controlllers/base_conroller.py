@@ -23,14 +23,14 @@ class BaseController:
         return result.scalar_one_or_none()
 
     async def create(self, instance: ModelType) -> ModelType:
+        # Generated keys and defaults come back through INSERT ... RETURNING,
+        # and sessions don't expire on commit, so no refresh is needed.
         self.db.add(instance)
         await self.db.commit()
-        await self.db.refresh(instance)
         return instance
 
     async def update(self, instance: ModelType) -> ModelType:
         await self.db.commit()
-        await self.db.refresh(instance)
         return instance
 
     async def delete(self, instance: ModelType) -> None:
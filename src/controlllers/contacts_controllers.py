@@ -1,10 +1,26 @@
-from typing import List, Sequence, Optional
+from typing import List, Optional
 import logging
 from datetime import date, timedelta
 
 
-from sqlalchemy import select, func, and_
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    select,
+    insert,
+    func,
+    or_,
+    case,
+    update,
+    delete,
+    any_,
+    bindparam,
+    column,
+    values,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.types import ARRAY, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncScalarResult
+from sqlalchemy.orm import load_only, joinedload
 from fastapi import HTTPException
 
 from src.models.models_contacts import Contact
@@ -17,52 +33,197 @@ from src.models.models_contacts import User
 
 logger = logging.getLogger("uvicorn.error")
 
+RESPONSE_FIELDS = tuple(ContactResponseSchema.model_fields)
+RESPONSE_COLUMNS = tuple(getattr(Contact, field) for field in RESPONSE_FIELDS)
+SEARCH_COLUMNS = (Contact.first_name, Contact.last_name, Contact.email, Contact.phone)
+UNIQUE_VIOLATION = "23505"
+DUPLICATE_CONTACT = "Contact with this email or phone already exists"
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _ids_param(ids: list[int]):
+    return bindparam("ids", ids, type_=ARRAY(Integer))
+
+
+def _is_unique_violation(error: IntegrityError) -> bool:
+    # SQLSTATE from asyncpg; the SQLite name covers the benchmarks
+    return (
+        getattr(error.orig, "sqlstate", None) == UNIQUE_VIOLATION
+        or getattr(error.orig, "sqlite_errorname", None) == "SQLITE_CONSTRAINT_UNIQUE"
+    )
+
+
+def _as_dicts(rows) -> list[dict]:
+    # List reads select plain columns and skip the ORM: the rows only ever
+    # become JSON, so identity map and attribute instrumentation are waste.
+    return [dict(zip(RESPONSE_FIELDS, row)) for row in rows]
+
 
 class ContactController:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @staticmethod
+    def _select(with_user: bool = False):
+        if with_user:
+            return select(Contact).options(joinedload(Contact.user))
+        return select(Contact).options(load_only(*RESPONSE_COLUMNS))
+
     async def get_contacts(
-        self, limit: int = 10, offset: int = 0, user: User = None
-    ) -> Sequence[Contact]:
-        stmt = select(Contact).filter_by(user_id=user.id).limit(limit).offset(offset)
-        contacts = await self.db.execute(stmt)
-        return contacts.scalars().all()
-
-    async def get_contact_by_id(self, contact_id: int, user: User) -> Contact:
-        stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        user: User = None,
+        after_id: Optional[int] = None,
+    ) -> list[dict]:
+        stmt = (
+            select(*RESPONSE_COLUMNS)
+            .where(Contact.user_id == user.id)
+            .order_by(Contact.id)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Contact.id > after_id)
+        else:
+            stmt = stmt.offset(offset)
+        stmt = stmt.limit(limit)
+        result = await self.db.execute(stmt)
+        return _as_dicts(result)
+
+    async def stream_contacts(
+        self, user_id: int, chunk_size: int = 1000
+    ) -> AsyncScalarResult[Contact]:
+        stmt = (
+            self._select()
+            .filter_by(user_id=user_id)
+            .order_by(Contact.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        return await self.db.stream_scalars(stmt)
+
+    async def get_contact_by_id(
+        self, contact_id: int, user: User, with_user: bool = False
+    ) -> Contact:
+        stmt = self._select(with_user).filter_by(id=contact_id, user_id=user.id)
         contact = await self.db.execute(stmt)
         return contact.scalar_one_or_none()
 
     async def create_contact(self, contact: ContactSchema, user: User) -> Contact:
-        new_contact = Contact(**contact.model_dump(), user=user)
-        self.db.add(new_contact)
+        stmt = (
+            insert(Contact)
+            .values(**contact.model_dump(), user_id=user.id)
+            .returning(Contact)
+        )
+        new_contact = await self.db.scalar(stmt)
         await self.db.commit()
-        await self.db.refresh(new_contact)
         return new_contact
 
+    async def bulk_create_contacts(self, rows: list[dict], user_id: int) -> set[str]:
+        if not rows:
+            return set()
+        stmt = (
+            pg_insert(Contact)
+            .values([{**row, "user_id": user_id} for row in rows])
+            .on_conflict_do_nothing()
+            .returning(Contact.email)
+        )
+        result = await self.db.execute(stmt)
+        inserted = set(result.scalars().all())
+        await self.db.commit()
+        return inserted
+
+    async def batch_update_contacts(
+        self, changes: dict[int, dict], user: User
+    ) -> set[int]:
+        # Items touching the same columns share one UPDATE ... FROM (VALUES
+        # ...), so a batch that edits the same fields costs one statement
+        # however its values differ.
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for contact_id, change in changes.items():
+            groups.setdefault(tuple(sorted(change)), []).append(contact_id)
+
+        updated = set()
+        try:
+            for fields, ids in groups.items():
+                columns = [
+                    column(field, Contact.__table__.c[field].type) for field in fields
+                ]
+                rows = values(column("id", Integer), *columns, name="changes").data(
+                    [
+                        (contact_id, *(changes[contact_id][field] for field in fields))
+                        for contact_id in ids
+                    ]
+                )
+                stmt = (
+                    update(Contact)
+                    .where(Contact.id == rows.c.id, Contact.user_id == user.id)
+                    .values({field: rows.c[field] for field in fields})
+                    .values(updated_at=func.now())
+                    .returning(Contact.id)
+                    .execution_options(synchronize_session=False)
+                )
+                result = await self.db.execute(stmt)
+                updated.update(result.scalars().all())
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            if not _is_unique_violation(e):
+                raise
+            raise HTTPException(status_code=409, detail=DUPLICATE_CONTACT)
+        return updated
+
+    async def batch_remove_contacts(self, ids: list[int], user: User) -> set[int]:
+        stmt = (
+            delete(Contact)
+            .where(Contact.user_id == user.id, Contact.id == any_(_ids_param(ids)))
+            .returning(Contact.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        deleted = set(result.scalars().all())
+        await self.db.commit()
+        return deleted
+
     async def update_contact(
         self, contact_id: int, contact: ContactUpdateSchema, user: User
     ) -> Contact:
-        db_contact = await self.get_contact_by_id(contact_id, user)
+        update_data = contact.model_dump(exclude_unset=True)
+        if not update_data:
+            db_contact = await self.get_contact_by_id(contact_id, user)
+        else:
+            stmt = (
+                update(Contact)
+                .where(Contact.id == contact_id, Contact.user_id == user.id)
+                .values(**update_data, updated_at=func.now())
+                .returning(Contact)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            try:
+                db_contact = await self.db.scalar(stmt)
+                await self.db.commit()
+            except IntegrityError as e:
+                await self.db.rollback()
+                if not _is_unique_violation(e):
+                    raise
+                raise HTTPException(status_code=409, detail=DUPLICATE_CONTACT)
 
         if not db_contact:
             raise HTTPException(status_code=404, detail="Contact not found")
-
-        update_data = contact.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_contact, key, value)
-
-        await self.db.commit()
-        await self.db.refresh(db_contact)
         return db_contact
 
     async def remove_contact(self, contact_id: int, user: User) -> None:
-        contact = await self.get_contact_by_id(contact_id, user)
-        if not contact:
-            raise HTTPException(status_code=404, detail="Contact not found")
-        await self.db.delete(contact)
+        stmt = (
+            delete(Contact)
+            .where(Contact.id == contact_id, Contact.user_id == user.id)
+            .returning(Contact.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_id = await self.db.scalar(stmt)
         await self.db.commit()
+        if deleted_id is None:
+            raise HTTPException(status_code=404, detail="Contact not found")
 
     async def search_contacts(
         self,
@@ -70,41 +231,79 @@ class ContactController:
         last_name: Optional[str] = None,
         email: Optional[str] = None,
         user: User = None,
-    ) -> Sequence[Contact]:
-        if not any([first_name, last_name, email, user]):
+        q: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> list[dict]:
+        if not any([q, first_name, last_name, email]):
             raise HTTPException(
                 status_code=400, detail="At least one search parameter must be provided"
             )
         filters = []
+        order_by = [Contact.id]
 
+        if q:
+            pattern = f"%{escape_like(q)}%"
+            filters.append(
+                or_(
+                    *(column.ilike(pattern, escape="\\") for column in SEARCH_COLUMNS),
+                    *(column.op("%")(q) for column in SEARCH_COLUMNS),
+                )
+            )
+            rank = func.greatest(
+                *(func.similarity(column, q) for column in SEARCH_COLUMNS)
+            )
+            order_by.insert(0, rank.desc())
         if last_name:
-            filters.append(Contact.last_name.ilike(f"%{last_name.lower()}%"))
+            filters.append(
+                Contact.last_name.ilike(f"%{escape_like(last_name)}%", escape="\\")
+            )
         if first_name:
-            filters.append(Contact.first_name.ilike(f"%{first_name.lower()}%"))
+            filters.append(
+                Contact.first_name.ilike(f"%{escape_like(first_name)}%", escape="\\")
+            )
         if email:
             filters.append(Contact.email == email)
 
-        stmt = select(Contact).where(*filters, Contact.user_id == user.id)
-        print(f"Generated SQL: {stmt}")
-        print(f"Last name filter: {last_name}")
+        stmt = (
+            select(*RESPONSE_COLUMNS)
+            .where(*filters, Contact.user_id == user.id)
+            .order_by(*order_by)
+            .limit(limit)
+            .offset(offset)
+        )
         result = await self.db.execute(stmt)
-        contacts = result.scalars().all()
+        contacts = _as_dicts(result)
 
         if not contacts:
             raise HTTPException(status_code=404, detail="Contacts not found")
         return contacts
 
-    async def get_contact_by_birthday(self, user: User) -> Sequence[Contact]:
-        today = date.today()
-        next_week = today + timedelta(days=7)
+    async def get_contact_by_birthday(
+        self, user: User, days: int = 7, today: Optional[date] = None
+    ) -> list[dict]:
+        today = today or date.today()
+        until = today + timedelta(days=days)
+        start_md = today.month * 100 + today.day
+        end_md = until.month * 100 + until.day
 
-        stmt = select(Contact).where(
-            and_(
-                func.to_char(Contact.birthday, "MM-DD") >= today.strftime("%m-%d"),
-                func.to_char(Contact.birthday, "MM-DD") <= next_week.strftime("%m-%d"),
-                Contact.user_id == user.id,
+        filters = [Contact.user_id == user.id]
+        if days < 365:
+            if start_md <= end_md:
+                filters.append(Contact.birthday_md.between(start_md, end_md))
+            else:
+                filters.append(
+                    or_(Contact.birthday_md >= start_md, Contact.birthday_md <= end_md)
+                )
+
+        stmt = (
+            select(*RESPONSE_COLUMNS)
+            .where(*filters)
+            .order_by(
+                case((Contact.birthday_md >= start_md, 0), else_=1),
+                Contact.birthday_md,
+                Contact.id,
             )
         )
         result = await self.db.execute(stmt)
-        contacts = result.scalars().all()
-        return contacts
+        return _as_dicts(result)
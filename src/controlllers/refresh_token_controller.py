@@ -1,8 +1,9 @@
 from datetime import datetime
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import delete, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from src.controlllers.base_conroller import BaseController
 from src.models.models_contacts import RefreshToken
@@ -22,10 +23,14 @@ class RefreshTokenController(BaseController):
     async def get_active_token(
         self, token_hash: str, current_time: datetime
     ) -> RefreshToken | None:
-        stmt = select(self.model).where(
-            RefreshToken.token_hash == token_hash,
-            RefreshToken.expired_at > current_time,
-            RefreshToken.revoked_at == None,
+        stmt = (
+            select(self.model)
+            .options(joinedload(RefreshToken.user))
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.expired_at > current_time,
+                RefreshToken.revoked_at == None,
+            )
         )
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
@@ -50,3 +55,26 @@ class RefreshTokenController(BaseController):
     async def revoke_token(self, refresh_token: RefreshToken) -> None:
         refresh_token.revoked_at = datetime.now()
         await self.db.commit()
+
+    async def delete_expired_batch(
+        self, time_now: datetime, revoked_before: datetime, batch_size: int
+    ) -> int:
+        # SKIP LOCKED leaves rows that a concurrent refresh/logout is touching
+        # to the next batch instead of waiting on them.
+        expired_ids = (
+            select(RefreshToken.id)
+            .where(
+                or_(
+                    RefreshToken.expired_at < time_now,
+                    RefreshToken.revoked_at < revoked_before,
+                )
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = delete(RefreshToken).where(RefreshToken.id.in_(expired_ids))
+        result = await self.db.execute(
+            stmt, execution_options={"synchronize_session": False}
+        )
+        await self.db.commit()
+        return result.rowcount
@@ -1,6 +1,6 @@
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.models_contacts import User
@@ -36,14 +36,20 @@ class UserController(BaseController):
         return await self.create(new_user)
 
     # func confirmed_email
-    async def confirmed_email(self, email: str):
-        user = await self.get_user_email(email)
-        user.confirmed = True
+    async def _update_by_email(self, email: str, **values) -> User | None:
+        stmt = (
+            update(User)
+            .where(User.email == email)
+            .values(**values)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        user = await self.db.scalar(stmt)
         await self.db.commit()
+        return user
+
+    async def confirmed_email(self, email: str) -> User:
+        return await self._update_by_email(email, confirmed=True)
 
     async def update_avatar(self, email: str, url: str) -> User:
-        user = await self.get_user_email(email)
-        user.avatar = url
-        await self.db.commit()
-        await self.db.refresh(user)
-        return user
+        return await self._update_by_email(email, avatar=url)
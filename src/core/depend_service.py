@@ -1,21 +1,63 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends
+from fastapi import Depends, Request
 
-from src.database.db import get_db
+from src.core.unit_of_work import UnitOfWork
+from src.database.db import is_pinned_to_primary, pin_to_primary
 from src.services.auth_service import AuthService, oauth2_scheme
+from src.services.contacts_import_service import ContactImportService
+from src.services.contacts_services import ContactService
 from src.services.user_service import UserService
 
 
-def get_auth_service(db: AsyncSession = Depends(get_db)):
-    return AuthService(db)
+async def get_uow(request: Request):
+    uow = UnitOfWork()
+    try:
+        yield uow
+    except Exception as e:
+        await uow.rollback(e)
+        raise
+    finally:
+        await uow.close()
+    if uow.committed:
+        await pin_to_primary(request)
 
 
-def get_user_service(db: AsyncSession = Depends(get_db)):
-    return UserService(db)
+async def get_read_uow(request: Request, uow: UnitOfWork = Depends(get_uow)):
+    # Must be resolved before anything queries through the unit of work, so
+    # routes list it ahead of get_current_user.
+    uow.read_only = not await is_pinned_to_primary(request)
+    return uow
 
 
 async def get_current_user(
-    auth_service: AuthService = Depends(get_user_service),
+    uow: UnitOfWork = Depends(get_uow),
     token: str = Depends(oauth2_scheme),
 ):
-    return await auth_service.get_current_user(token)
+    return await uow.auth.get_current_user(token)
+
+
+def get_auth_service(uow: UnitOfWork = Depends(get_uow)) -> AuthService:
+    return uow.auth
+
+
+def get_read_auth_service(uow: UnitOfWork = Depends(get_read_uow)) -> AuthService:
+    return uow.auth
+
+
+def get_user_service(uow: UnitOfWork = Depends(get_uow)) -> UserService:
+    return uow.users
+
+
+def get_contact_service(uow: UnitOfWork = Depends(get_uow)) -> ContactService:
+    return uow.contacts
+
+
+def get_read_contact_service(
+    uow: UnitOfWork = Depends(get_read_uow),
+) -> ContactService:
+    return uow.contacts
+
+
+def get_contact_import_service(
+    uow: UnitOfWork = Depends(get_uow),
+) -> ContactImportService:
+    return uow.contacts_import
@@ -0,0 +1,30 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def contact_etag(contact_id: int, updated_at: Optional[datetime]) -> Optional[str]:
+    if updated_at is None:
+        return None
+    return make_etag("contact", contact_id, round(updated_at.timestamp() * 1e6))
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
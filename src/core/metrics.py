@@ -0,0 +1,137 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled", ["method"]
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling a request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    "db_seconds_per_request",
+    "Time spent in SQL statements while handling a request",
+    ["method", "route"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Latency of individual SQL statements"
+)
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Latency of Redis commands",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time bcrypt jobs waited for a pool thread",
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started_at"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info.pop("query_started_at", None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    DB_QUERY_LATENCY.observe(elapsed)
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def observe_redis(command: str, seconds: float) -> None:
+    REDIS_LATENCY.labels(command.upper()).observe(seconds)
+
+
+class StatsCollector:
+    """Exposes a component's ``metrics()`` dict as Prometheus samples.
+
+    Keys listed in ``counters`` become counters, everything else a gauge.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], dict], counters: set[str]):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = counters
+
+    def collect(self):
+        for key, value in self.stats().items():
+            name = f"{self.prefix}_{key}"
+            if key in self.counters:
+                yield CounterMetricFamily(name, name, value=float(value))
+            else:
+                yield GaugeMetricFamily(name, name, value=float(value))
+
+
+def register_stats(
+    prefix: str, stats: Callable[[], dict], counters: Iterable[str] = ()
+) -> None:
+    REGISTRY.register(StatsCollector(prefix, stats, set(counters)))
+
+
+async def metrics_middleware(request: Request, call_next):
+    stats = RequestStats()
+    token = request_stats.set(stats)
+    method = request.method
+    REQUESTS_IN_FLIGHT.labels(method).inc()
+    status_code = 500
+    started_at = time.perf_counter()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started_at
+        REQUESTS_IN_FLIGHT.labels(method).dec()
+        request_stats.reset(token)
+        # label by template, not raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        template = getattr(route, "path", UNMATCHED_ROUTE)
+        REQUEST_LATENCY.labels(method, template, status_code).observe(elapsed)
+        DB_QUERIES_PER_REQUEST.labels(method, template).observe(stats.queries)
+        DB_SECONDS_PER_REQUEST.labels(method, template).observe(stats.db_seconds)
+
+
+async def metrics_endpoint() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from src.conf.config import settings
+from src.core.metrics import PASSWORD_HASH_WAIT
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool instead of the event loop.
+
+    bcrypt releases the GIL while hashing, so threads scale with cores. Jobs
+    beyond ``max_pending`` (queued plus running) are rejected with 503 rather
+    than piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bcrypt"
+        )
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            return func(*args), started_at, time.perf_counter()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at, finished_at = await loop.run_in_executor(
+                self._executor, job
+            )
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        PASSWORD_HASH_WAIT.observe(started_at - submitted_at)
+        self.wait_seconds_total += started_at - submitted_at
+        self.run_seconds_total += finished_at - started_at
+        return result
+
+    async def hash_password(self, password: str) -> str:
+        hashed_password = await self._run(
+            bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt()
+        )
+        return hashed_password.decode("utf-8")
+
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        return await self._run(
+            bcrypt.checkpw, password.encode(), hashed_password.encode()
+        )
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_seconds_total,
+            "run_seconds_total": self.run_seconds_total,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
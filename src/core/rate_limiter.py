@@ -0,0 +1,180 @@
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import jwt
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+
+logger = logging.getLogger("uvicorn.error")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Token bucket over every key passed in. All buckets are checked before any is
+# charged, so a request denied by the user bucket does not drain the IP bucket.
+# Time comes from the Redis server so API workers with skewed clocks agree.
+# KEYS: bucket keys; ARGV: capacity, refill per millisecond, cost
+# Returns {allowed, tokens left in the tightest bucket, ms until retry}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local ttl = math.ceil(capacity / rate)
+
+local levels = {}
+local remaining = capacity
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, math.ceil((cost - tokens) / rate))
+    end
+    remaining = math.min(remaining, tokens)
+end
+
+if wait > 0 then
+    return {0, math.floor(remaining), wait}
+end
+
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'tokens', levels[i] - cost, 'ts', now)
+    redis.call('PEXPIRE', key, ttl)
+end
+return {1, math.floor(remaining - cost), 0}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    capacity: int
+    period: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour|day)\s*", value)
+        if not match:
+            raise ValueError(f"Invalid rate limit {value!r}, expected e.g. 10/minute")
+        return cls(int(match[1]), PERIODS[match[2]])
+
+    @property
+    def refill_per_ms(self) -> float:
+        return self.capacity / (self.period * 1000)
+
+
+class RateLimiter:
+    """Per-route-group token buckets in Redis, shared by every API worker.
+
+    Each request is charged against a bucket for the client IP and, when it
+    carries a valid access token, one for the user as well. If Redis is down
+    the request is let through.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, RateLimit],
+        groups: list[tuple[str, str]],
+        default_group: str = "default",
+        client=redis_client,
+    ):
+        self.limits = limits
+        self.groups = groups
+        self.default_group = default_group
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.checked = 0
+        self.rejected = 0
+        self.errors = 0
+        self.seconds_total = 0.0
+
+    def group_for(self, path: str) -> str:
+        for prefix, group in self.groups:
+            if path.startswith(prefix):
+                return group
+        return self.default_group
+
+    @staticmethod
+    def _user_key(request: Request) -> Optional[str]:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        # verified, otherwise a forged token could drain another user's bucket
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        except jwt.PyJWTError:
+            return None
+        username = payload.get("sub")
+        return f"user:{username}" if username else None
+
+    async def check(self, request: Request) -> Optional[JSONResponse]:
+        started_at = time.perf_counter()
+        group = self.group_for(request.url.path)
+        limit = self.limits[group]
+        keys = [f"rl:{group}:ip:{request.client.host if request.client else '-'}"]
+        user_key = self._user_key(request)
+        if user_key:
+            keys.append(f"rl:{group}:{user_key}")
+
+        try:
+            allowed, remaining, retry_ms = await self._script(
+                keys=keys, args=[limit.capacity, limit.refill_per_ms, 1]
+            )
+        except RedisError as e:
+            self.errors += 1
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return None
+        finally:
+            self.checked += 1
+            self.seconds_total += time.perf_counter() - started_at
+
+        if allowed:
+            request.state.rate_limit = (limit.capacity, remaining)
+            return None
+
+        self.rejected += 1
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Rate limit exceeded"},
+            headers={
+                "Retry-After": str(math.ceil(retry_ms / 1000)),
+                "X-RateLimit-Limit": str(limit.capacity),
+                "X-RateLimit-Remaining": "0",
+            },
+        )
+
+    def metrics(self) -> dict:
+        return {
+            "checked": self.checked,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "seconds_total": self.seconds_total,
+        }
+
+
+rate_limiter = RateLimiter(
+    limits={
+        "auth": RateLimit.parse(settings.RATE_LIMIT_AUTH),
+        "search": RateLimit.parse(settings.RATE_LIMIT_SEARCH),
+        "contacts": RateLimit.parse(settings.RATE_LIMIT_CONTACTS),
+        "default": RateLimit.parse(settings.RATE_LIMIT_DEFAULT),
+    },
+    # first matching prefix wins
+    groups=[
+        ("/api/auth", "auth"),
+        ("/api/contacts/search", "search"),
+        ("/api/contacts", "contacts"),
+    ],
+)
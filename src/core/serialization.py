@@ -0,0 +1,18 @@
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+
+
+def dump_json(value: Any) -> bytes:
+    # OPT_UTC_Z writes UTC offsets as "Z", matching what pydantic produces
+    return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+
+
+def json_response(payload: bytes, headers: Optional[dict] = None) -> Response:
+    """Send an already encoded JSON body, skipping response_model validation.
+
+    Only for payloads built from trusted database rows in the shape of the
+    route's declared response model.
+    """
+    return Response(content=payload, media_type="application/json", headers=headers)
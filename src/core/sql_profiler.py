@@ -0,0 +1,154 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.conf.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+EXPLAIN_HEADER = "X-SQL-Explain"
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN (ANALYZE, BUFFERS) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+@dataclass
+class QueryProfile:
+    label: str
+    explain: bool = False
+    queries: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class SQLProfiler:
+    """Opt-in per-request SQL profiling.
+
+    Logs statements slower than ``slow_ms`` with their parameters and, at the
+    end of a request, every statement it ran ``repeat_threshold`` times or
+    more (the usual N+1 signature). When ``explain_enabled`` is set, requests
+    sent with ``X-SQL-Explain: 1`` also log the plan of each SELECT.
+    """
+
+    def __init__(
+        self,
+        slow_ms: float,
+        repeat_threshold: int,
+        explain_enabled: bool,
+        max_param_chars: int = 500,
+    ):
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.explain_enabled = explain_enabled
+        self.max_param_chars = max_param_chars
+        self._installed = False
+
+    def install(self) -> None:
+        if self._installed:
+            return
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        self._installed = True
+
+    def _format_params(self, parameters) -> str:
+        text = repr(parameters)
+        if len(text) > self.max_param_chars:
+            return text[: self.max_param_chars] + "..."
+        return text
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info["profiler_started_at"] = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        started_at = conn.info.pop("profiler_started_at", None)
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+        profile = current_profile.get()
+        label = profile.label if profile else "no request"
+        if profile is not None:
+            profile.queries += 1
+            profile.seconds += elapsed
+            profile.statements[statement] += 1
+
+        if elapsed * 1000 >= self.slow_ms:
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms) [{label}]: {statement} "
+                f"params={self._format_params(parameters)}"
+            )
+
+        if (
+            profile is not None
+            and profile.explain
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            # a server-side cursor still has rows pending on this connection
+            and not context.execution_options.get("stream_results")
+        ):
+            self._explain(conn, statement, parameters, label)
+
+    def _explain(self, conn, statement, parameters, label: str) -> None:
+        # Only SELECTs get here: EXPLAIN ANALYZE really executes the statement.
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if prefix is None:
+            return
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = "\n".join(
+                " ".join(str(column) for column in row) for row in cursor.fetchall()
+            )
+        except Exception as e:
+            logger.warning(f"EXPLAIN failed [{label}]: {e}")
+            return
+        finally:
+            cursor.close()
+        logger.info(f"Query plan [{label}]: {statement}\n{plan}")
+
+    def report(self, profile: QueryProfile) -> None:
+        for statement, count in profile.statements.items():
+            if count >= self.repeat_threshold:
+                logger.warning(
+                    f"Repeated statement, possible N+1 [{profile.label}]: "
+                    f"ran {count} times: {statement}"
+                )
+        logger.debug(
+            f"[{profile.label}] {profile.queries} queries, "
+            f"{profile.seconds * 1000:.1f} ms in SQL"
+        )
+
+    async def middleware(self, request: Request, call_next):
+        profile = QueryProfile(
+            label=f"{request.method} {request.url.path}",
+            explain=self.explain_enabled and request.headers.get(EXPLAIN_HEADER) == "1",
+        )
+        token = current_profile.set(profile)
+        try:
+            return await call_next(request)
+        finally:
+            current_profile.reset(token)
+            self.report(profile)
+
+
+sql_profiler = SQLProfiler(
+    slow_ms=settings.SQL_SLOW_QUERY_MS,
+    repeat_threshold=settings.SQL_REPEATED_STATEMENT_THRESHOLD,
+    explain_enabled=settings.SQL_EXPLAIN_ENABLED,
+)
@@ -0,0 +1,70 @@
+import logging
+from functools import cached_property
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import session_manager
+from src.services.auth_service import AuthService
+from src.services.contacts_import_service import ContactImportService
+from src.services.contacts_services import ContactService
+from src.services.user_service import UserService
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class UnitOfWork:
+    """Services for one request, all sharing one lazily created session.
+
+    Services are built on first access and the session when the first service
+    is. The session only checks out a connection when it runs its first
+    query, so a request answered from cache never touches the pool.
+    """
+
+    def __init__(self, read_only: bool = False):
+        self.read_only = read_only
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = session_manager.new_session(self.read_only)
+        return self._session
+
+    @property
+    def on_replica(self) -> bool:
+        return self.read_only and session_manager.has_replicas
+
+    @property
+    def committed(self) -> bool:
+        return self._session is not None and bool(self._session.info.get("committed"))
+
+    @cached_property
+    def auth(self) -> AuthService:
+        return AuthService(self.session)
+
+    @cached_property
+    def users(self) -> UserService:
+        return UserService(self.session, auth_service=self.auth)
+
+    @cached_property
+    def contacts(self) -> ContactService:
+        return ContactService(self.session, from_replica=self.on_replica)
+
+    @cached_property
+    def contacts_import(self) -> ContactImportService:
+        return ContactImportService(self.session)
+
+    async def rollback(self, error: Exception) -> None:
+        if self._session is None:
+            return
+        if isinstance(error, SQLAlchemyError):
+            logger.error(f"Database error: {error}")
+        else:
+            logger.error(f"Unexpected error: {error}", exc_info=True)
+        await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
@@ -1,26 +1,120 @@
 import contextlib
+import itertools
 import logging
+import time
+from typing import Optional
+from uuid import uuid4
 
+import jwt
+from fastapi import Request
+from redis.exceptions import RedisError
+from sqlalchemy import URL, event, make_url
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.conf.config import settings
+from src.database.redis_client import redis_client
 
 logger = logging.getLogger("uvicorn.error")
 
 
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started_at
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def engine_config(url: str) -> tuple[URL, dict]:
+    engine_url = make_url(url)
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if engine_url.get_driver_name() != "asyncpg":
+        return engine_url, options
+
+    cache_size = 0 if settings.DB_PGBOUNCER else settings.DB_STATEMENT_CACHE_SIZE
+    engine_url = engine_url.update_query_dict(
+        {"prepared_statement_cache_size": str(cache_size)}
+    )
+    options["connect_args"] = {"statement_cache_size": cache_size}
+    if settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode may hand every transaction a different
+        # server connection, so prepared statement names must never repeat.
+        options["connect_args"][
+            "prepared_statement_name_func"
+        ] = lambda: f"__asyncpg_{uuid4()}__"
+    return engine_url, options
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed(session: Session) -> None:
+    session.info["committed"] = True
+
+
 class DatabaseSessionManager:
-    def __init__(self, url: str):
-        self._engine: AsyncEngine = create_async_engine(url)
+    def __init__(self, url: str, replica_urls: Optional[list[str]] = None):
+        engine_url, options = engine_config(url)
+        self._engine: AsyncEngine = create_async_engine(engine_url, **options)
         self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
+            autoflush=False, autocommit=False, expire_on_commit=False, bind=self._engine
+        )
+        self._replica_engines: list[AsyncEngine] = []
+        for replica_url in replica_urls or []:
+            engine_url, options = engine_config(replica_url)
+            self._replica_engines.append(create_async_engine(engine_url, **options))
+        self._replica_makers = itertools.cycle(
+            [
+                async_sessionmaker(
+                    autoflush=False,
+                    autocommit=False,
+                    expire_on_commit=False,
+                    bind=engine,
+                )
+                for engine in self._replica_engines
+            ]
         )
 
-    @contextlib.asynccontextmanager
-    async def session(self):
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replica_engines)
+
+    def new_session(self, read_only: bool = False) -> AsyncSession:
+        # no connection is checked out until the session runs its first query
         if self._session_maker is None:
             raise Exception("Database session is not initialized")
-        session = self._session_maker()
+        if read_only and self.has_replicas:
+            return next(self._replica_makers)()
+        return self._session_maker()
+
+    @contextlib.asynccontextmanager
+    async def session(self, read_only: bool = False):
+        session = self.new_session(read_only)
         try:
             yield session
         except SQLAlchemyError as e:
@@ -34,10 +128,60 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    def pool_metrics(self) -> dict:
+        pool = self._engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": pool.checkouts,
+            "wait_seconds_total": pool.wait_seconds_total,
+            "wait_seconds_max": pool.wait_seconds_max,
+        }
+
+    async def close(self) -> None:
+        await self._engine.dispose()
+        for engine in self._replica_engines:
+            await engine.dispose()
+
+
+session_manager = DatabaseSessionManager(settings.DB_URL, settings.DB_REPLICA_URLS)
+
+
+def _sticky_key(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    # Only used to pick a database, so the signature is checked later by auth.
+    try:
+        payload = jwt.decode(token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return None
+    username = payload.get("sub")
+    return f"rw:{username}" if username else None
+
 
-session_manager = DatabaseSessionManager(settings.DB_URL)
+async def is_pinned_to_primary(request: Request) -> bool:
+    if not session_manager.has_replicas:
+        return True
+    key = _sticky_key(request)
+    if not key:
+        return False
+    try:
+        return bool(await redis_client.exists(key))
+    except RedisError as e:
+        logger.warning(f"Could not check read-your-writes pin: {e}")
+        return True
 
 
-async def get_db():
-    async with session_manager.session() as session:
-        yield session
+async def pin_to_primary(request: Request) -> None:
+    if not session_manager.has_replicas:
+        return
+    key = _sticky_key(request)
+    if not key:
+        return
+    try:
+        await redis_client.set(key, 1, ex=settings.DB_READ_YOUR_WRITES_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Could not pin reads to primary: {e}")
@@ -0,0 +1,23 @@
+import time
+
+import redis.asyncio as redis
+
+from src.conf.config import settings
+from src.core.metrics import observe_redis
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that records the latency of every command it sends.
+
+    Pipelines are sent as one round trip and are not broken down here.
+    """
+
+    async def execute_command(self, *args, **options):
+        started_at = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            observe_redis(str(args[0]), time.perf_counter() - started_at)
+
+
+redis_client = InstrumentedRedis.from_url(settings.REDIS_URL)
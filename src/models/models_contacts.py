@@ -1,7 +1,21 @@
 from datetime import date, datetime
 
 
-from sqlalchemy import String, Date, func, Boolean, ForeignKey, DateTime
+from sqlalchemy import (
+    String,
+    Date,
+    func,
+    Boolean,
+    ForeignKey,
+    DateTime,
+    Index,
+    Integer,
+    Computed,
+    cast,
+    column,
+    extract,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from src.conf.constants import NAME_MAX_LENGTH, NAME_MIN_LENGTH, MAX_PHONE_LENGTH
@@ -13,6 +27,19 @@ class Base(DeclarativeBase):
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_birthday_md", "user_id", "birthday_md"),
+        *(
+            Index(
+                f"ix_contacts_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("first_name", "last_name", "email", "phone")
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str] = mapped_column(String(NAME_MAX_LENGTH), nullable=False)
@@ -26,12 +53,30 @@ class Contact(Base):
     birthday: Mapped[date] = mapped_column(
         Date, default=func.current_date(), nullable=False
     )
-    additional_data: Mapped[str] = mapped_column(String(NAME_MAX_LENGTH))
+    # month * 100 + day, e.g. 1231 for December 31st
+    birthday_md: Mapped[int] = mapped_column(
+        Integer,
+        Computed(
+            cast(
+                extract("month", column("birthday")) * 100
+                + extract("day", column("birthday")),
+                Integer,
+            ),
+            persisted=True,
+        ),
+    )
+    additional_data: Mapped[str] = mapped_column(String(NAME_MAX_LENGTH), nullable=True)
 
     created_at: Mapped[date] = mapped_column(Date, default=func.current_date())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    user: Mapped["User"] = relationship("User", backref="contacts", lazy="joined")
+    user: Mapped["User"] = relationship("User", backref="contacts", lazy="raise")
 
 
 class User(Base):
@@ -52,6 +97,14 @@ class User(Base):
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_expired_at", "expired_at"),
+        Index(
+            "ix_refresh_tokens_revoked_at",
+            "revoked_at",
+            postgresql_where=text("revoked_at IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -1,38 +1,37 @@
 import logging
 
 
-from fastapi import APIRouter, Depends, Request, status, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Request, status, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.core.depend_service import get_auth_service
 from src.schemas.token_schemas import TokenResponseSchema, RefreshTokenResponseSchema
 from src.services.auth_service import AuthService, oauth2_scheme
 from src.schemas.user_schemas import UserCreateSchema, UserResponseSchema
-from src.services.service_email import send_email
-
+from src.services.service_email import enqueue_verify_email
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 logger = logging.getLogger("uvicorn.error")
 
 
-def get_auth_service(db: AsyncSession = Depends(get_db)):
-    return AuthService(db)
-
-
 @router.post(
     "/register", response_model=UserResponseSchema, status_code=status.HTTP_201_CREATED
 )
 async def register_user(
     data: UserCreateSchema,
-    background_tasks: BackgroundTasks,
     request: Request,
     auth_service: AuthService = Depends(get_auth_service),
 ):
     user = await auth_service.register_user(data)
 
-    background_tasks.add_task(
-        send_email, data.email, data.username, str(request.base_url)
+    # the account is already committed, so a retry has to go through
+    # request_email rather than register again
+    await enqueue_verify_email(
+        data.email,
+        data.username,
+        str(request.base_url),
+        failure_detail="Account created, but the confirmation email could not be "
+        "sent. Request a new one from /api/users/request_email",
     )
 
     return user
@@ -1,43 +1,104 @@
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, status, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
-from src.database.db import get_db
 from src.services.contacts_services import ContactService
+from src.services.contacts_export_service import ContactExportService, ExportFormat
+from src.services.contacts_import_service import (
+    ContactImportService,
+    ImportFormat,
+    detect_format,
+)
 from src.schemas.contact_schemas import (
     ContactSchema,
     ContactResponseSchema,
     ContactUpdateSchema,
+    ContactImportReportSchema,
+    ContactBatchUpdateSchema,
+    ContactBatchDeleteSchema,
+    ContactBatchResultSchema,
+)
+from src.core.depend_service import (
+    get_contact_import_service,
+    get_contact_service,
+    get_current_user,
+    get_read_contact_service,
 )
-from src.core.depend_service import get_current_user
+from src.core.etag import contact_etag, etag_matches, not_modified
+from src.core.pagination import encode_cursor, decode_cursor
+from src.core.serialization import json_response
 from src.models.models_contacts import User
 
-
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 logger = logging.getLogger("uvicorn.error")
 
 
 @router.get("/", response_model=list[ContactResponseSchema])
 async def get_contacts(
-    limit: int = Query(10, le=100),
+    limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
+    after: Optional[str] = Query(
+        None, description="Cursor from X-Next-Cursor of the previous page"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    contact_service: ContactService = Depends(get_read_contact_service),
+    user: User = Depends(get_current_user),
+):
+    after_id = decode_cursor(after) if after else None
+    etag = await contact_service.list_etag(user, "list", limit, offset, after_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    payload, next_id = await contact_service.get_contacts(limit, offset, user, after_id)
+    headers = {}
+    if etag and not contact_service.served_from_replica:
+        headers["ETag"] = etag
+    if next_id is not None:
+        headers["X-Next-Cursor"] = encode_cursor(next_id)
+    return json_response(payload, headers)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_contacts(
+    file_format: ExportFormat = Query("ndjson", alias="format"),
+    gzip: bool = Query(False, description="Compress the export with gzip"),
     user: User = Depends(get_current_user),
 ):
-    contact_service = ContactService(db)
-    return await contact_service.get_contacts(limit, offset, user)
+    export_service = ContactExportService(file_format, gzip)
+    return StreamingResponse(
+        export_service.export_contacts(user.id),
+        media_type=export_service.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_service.filename}"'
+        },
+    )
 
 
 @router.get("/{contact_id}", response_model=ContactResponseSchema)
 async def get_contact(
     contact_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    contact_service: ContactService = Depends(get_read_contact_service),
     user: User = Depends(get_current_user),
 ):
-    contact_service = ContactService(db)
-    return await contact_service.get_contact_by_id(contact_id, user)
+    contact = await contact_service.get_contact_by_id(contact_id, user)
+    etag = contact_etag(contact.id, contact.updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if etag:
+        response.headers["ETag"] = etag
+    return contact
 
 
 @router.post(
@@ -45,50 +106,88 @@ async def get_contact(
 )
 async def create_contact(
     contact: ContactSchema,
-    db: AsyncSession = Depends(get_db),
+    contact_service: ContactService = Depends(get_contact_service),
     user: User = Depends(get_current_user),
 ):
-    contact_service = ContactService(db)
     return await contact_service.create_contact(contact, user)
 
 
+@router.post("/bulk", response_model=ContactImportReportSchema)
+async def import_contacts(
+    file: UploadFile = File(description="CSV with a header row or NDJSON"),
+    file_format: Optional[ImportFormat] = Query(None, alias="format"),
+    import_service: ContactImportService = Depends(get_contact_import_service),
+    user: User = Depends(get_current_user),
+):
+    return await import_service.import_contacts(
+        file, file_format or detect_format(file), user
+    )
+
+
+@router.patch("/batch", response_model=list[ContactBatchResultSchema])
+async def batch_update_contacts(
+    body: ContactBatchUpdateSchema,
+    contact_service: ContactService = Depends(get_contact_service),
+    user: User = Depends(get_current_user),
+):
+    return await contact_service.batch_update_contacts(body.items, user)
+
+
+@router.delete("/batch", response_model=list[ContactBatchResultSchema])
+async def batch_remove_contacts(
+    body: ContactBatchDeleteSchema,
+    contact_service: ContactService = Depends(get_contact_service),
+    user: User = Depends(get_current_user),
+):
+    return await contact_service.batch_remove_contacts(body.ids, user)
+
+
 @router.put("/{contact_id}", response_model=ContactResponseSchema)
 async def update_contact(
     contact_id: int,
     contact: ContactUpdateSchema,
-    db: AsyncSession = Depends(get_db),
+    contact_service: ContactService = Depends(get_contact_service),
     user: User = Depends(get_current_user),
 ):
-    contact_service = ContactService(db)
     return await contact_service.update_contact(contact_id, contact, user)
 
 
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_contact(
     contact_id: int,
-    db: AsyncSession = Depends(get_db),
+    contact_service: ContactService = Depends(get_contact_service),
     user: User = Depends(get_current_user),
 ):
-    contact_service = ContactService(db)
     return await contact_service.remove_contact(contact_id, user)
 
 
 @router.get("/search/", response_model=list[ContactResponseSchema])
 async def search_contacts(
+    q: Optional[str] = Query(
+        None,
+        min_length=1,
+        max_length=100,
+        description="Text to match against name, email and phone",
+    ),
     first_name: Optional[str] = Query(None, description="First name of the contact"),
     last_name: Optional[str] = Query(None, description="Last name of the contact"),
     email: Optional[str] = Query(None, description="Email of the contact"),
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    contact_service: ContactService = Depends(get_read_contact_service),
     user: User = Depends(get_current_user),
 ):
-    contact_service = ContactService(db)
-    print("Services - print", f"first_name: {first_name}, last_name: {last_name}")
-    return await contact_service.search_contacts(first_name, last_name, email, user)
+    return json_response(
+        await contact_service.search_contacts(
+            first_name, last_name, email, user, q, limit, offset
+        )
+    )
 
 
 @router.get("/birthday/", response_model=list[ContactResponseSchema])
 async def get_contact_by_birthday(
-    db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)
+    days: int = Query(7, ge=1, le=366, description="Days ahead to look for birthdays"),
+    contact_service: ContactService = Depends(get_read_contact_service),
+    user: User = Depends(get_current_user),
 ):
-    contact_service = ContactService(db)
-    return await contact_service.get_contact_by_birthday(user)
+    return json_response(await contact_service.get_contact_by_birthday(user, days))
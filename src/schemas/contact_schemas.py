@@ -1,10 +1,15 @@
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Literal, Optional
 
 from markdown_it.rules_inline.backticks import regex
 from pydantic import BaseModel, EmailStr, ConfigDict, Field
 
-from src.conf.constants import NAME_MAX_LENGTH, NAME_MIN_LENGTH, MAX_PHONE_LENGTH
+from src.conf.constants import (
+    NAME_MAX_LENGTH,
+    NAME_MIN_LENGTH,
+    MAX_PHONE_LENGTH,
+    BATCH_MAX_ITEMS,
+)
 
 
 class ContactSchema(BaseModel):
@@ -52,5 +57,39 @@ class ContactResponseSchema(BaseModel):
     phone: str
     birthday: date
     additional_data: Optional[str]
+    # optional so cache entries written before the column existed still load
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ContactImportErrorSchema(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ContactImportReportSchema(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: list[ContactImportErrorSchema] = []
+
+
+class ContactBatchUpdateItemSchema(ContactUpdateSchema):
+    id: int
+
+
+class ContactBatchUpdateSchema(BaseModel):
+    items: list[ContactBatchUpdateItemSchema] = Field(
+        min_length=1, max_length=BATCH_MAX_ITEMS
+    )
+
+
+class ContactBatchDeleteSchema(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class ContactBatchResultSchema(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found"]
@@ -2,8 +2,6 @@ from datetime import datetime, timedelta, timezone
 import secrets
 
 import jwt
-import redis.asyncio as redis
-import bcrypt
 import hashlib
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -11,13 +9,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from libgravatar import Gravatar
 
 from src.conf.config import settings
+from src.core.password_hasher import password_hasher
+from src.database.redis_client import redis_client
 from src.models.models_contacts import User
 from src.schemas.user_schemas import UserCreateSchema
 from src.controlllers.user_conrollers import UserController
 from src.controlllers.refresh_token_controller import RefreshTokenController
+from src.services.token_revocation_service import token_revocation
+from src.services.user_cache_service import UserCacheService
 
-
-redis_client = redis.from_url(settings.REDIS_URL)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 
@@ -26,14 +26,13 @@ class AuthService:
         self.db = db
         self.user_controller = UserController(self.db)
         self.refresh_token_controller = RefreshTokenController(self.db)
+        self.user_cache = UserCacheService()
 
-    def _hash_password(self, password: str) -> str:
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
-        return hashed_password.decode("utf-8")
+    async def _hash_password(self, password: str) -> str:
+        return await password_hasher.hash_password(password)
 
-    def _verify_password(self, password: str, hashed_password: str) -> bool:
-        return bcrypt.checkpw(password.encode(), hashed_password.encode())
+    async def _verify_password(self, password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify_password(password, hashed_password)
 
     def _hash_token(self, token: str) -> str:
         return hashlib.sha256(token.encode()).hexdigest()
@@ -51,7 +50,7 @@ class AuthService:
                 detail="User not confirmed",
             )
 
-        if not self._verify_password(password, user.hash_password):
+        if not await self._verify_password(password, user.hash_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
@@ -77,7 +76,7 @@ class AuthService:
         except Exception as e:
             print(e)
 
-        hashed_password = self._hash_password(user.password)
+        hashed_password = await self._hash_password(user.password)
         user = await self.user_controller.create_user(user, hashed_password, avatar)
 
         return user
@@ -86,7 +85,7 @@ class AuthService:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         expire = datetime.now(timezone.utc) + expires_delta
 
-        to_encode = {"exp": expire, "sub": username}
+        to_encode = {"exp": expire, "sub": username, "jti": secrets.token_urlsafe(12)}
         encoded_jwt = jwt.encode(
             to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
         )
@@ -116,13 +115,20 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token not valid"
             )
 
+    async def _is_revoked(self, token: str, payload: dict) -> bool:
+        jti = payload.get("jti")
+        if jti is None:
+            # issued before tokens carried a jti; they were blacklisted whole
+            return bool(await redis_client.exists(f"bl:{token}"))
+        return await token_revocation.is_revoked(jti)
+
     async def get_current_user(self, token: str = Depends(oauth2_scheme)) -> User:
-        if await redis_client.exists(f"bl:{token}"):
+        payload = self.decode_and_verify_access_token(token)
+        if await self._is_revoked(token, payload):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token not valid"
             )
 
-        payload = self.decode_and_verify_access_token(token)
         username = payload.get("sub")
         if username is None:
             raise HTTPException(
@@ -130,11 +136,16 @@ class AuthService:
                 detail="Invalid authentication credentials",
             )
 
+        user = await self.user_cache.get(username)
+        if user is not None:
+            return user
+
         user = await self.user_controller.get_by_username(username=username)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
+        await self.user_cache.set(user)
 
         return user
 
@@ -167,7 +178,12 @@ class AuthService:
     async def revoke_access_token(self, token: str) -> None:
         payload = self.decode_and_verify_access_token(token)
         exp = payload.get("exp")
-        if exp:
+        if not exp:
+            return
+        jti = payload.get("jti")
+        if jti is None:
             await redis_client.setex(
-                f"bl:{token}", exp - datetime.now(timezone.utc).timestamp(), "1"
+                f"bl:{token}", int(exp - datetime.now(timezone.utc).timestamp()), "1"
             )
+            return
+        await token_revocation.revoke(jti, exp)
@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import time
+from typing import Any, Optional
+
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.models.models_contacts import Contact
+from src.schemas.contact_schemas import ContactResponseSchema
+
+logger = logging.getLogger("uvicorn.error")
+
+# A missing version starts from the current time rather than 0, so versions
+# (and the ETags built from them) are not reissued if Redis loses the key.
+BUMP_VERSION_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'NX')
+return redis.call('INCR', KEYS[1])
+"""
+
+
+class ContactCacheService:
+    """Read-through cache of serialized contact responses, one namespace per user.
+
+    Every entry key embeds the user's current version number, so a write only
+    has to bump the version to make all earlier entries unreachable; they then
+    age out through their TTL. The version is read at most once per instance
+    (one instance serves one request) and doubles as the list ETag source.
+    """
+
+    def __init__(
+        self,
+        ttl: int = settings.CONTACTS_CACHE_TTL_SECONDS,
+        max_entry_bytes: int = settings.CONTACTS_CACHE_MAX_ENTRY_BYTES,
+    ):
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self._versions: dict[int, int] = {}
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return f"contacts:ver:{user_id}"
+
+    async def version(self, user_id: int) -> Optional[int]:
+        if user_id in self._versions:
+            return self._versions[user_id]
+        key = self._version_key(user_id)
+        try:
+            version = await redis_client.get(key)
+            if version is None:
+                await redis_client.set(key, time.time_ns() // 1000, nx=True)
+                version = await redis_client.get(key)
+        except RedisError as e:
+            logger.warning(f"Contacts cache unavailable: {e}")
+            return None
+        self._versions[user_id] = int(version)
+        return self._versions[user_id]
+
+    async def make_key(self, user_id: int, kind: str, *params: Any) -> Optional[str]:
+        version = await self.version(user_id)
+        if version is None:
+            return None
+        digest = hashlib.md5(repr(params).encode()).hexdigest()
+        return f"contacts:{user_id}:v{version}:{kind}:{digest}"
+
+    async def _get(self, key: Optional[str]) -> Optional[bytes]:
+        if key is None:
+            return None
+        try:
+            return await redis_client.get(key)
+        except RedisError as e:
+            logger.warning(f"Contacts cache read failed: {e}")
+            return None
+
+    async def _set(self, key: Optional[str], payload: bytes) -> None:
+        if key is None or len(payload) > self.max_entry_bytes:
+            return
+        try:
+            await redis_client.set(key, payload, ex=self.ttl)
+        except RedisError as e:
+            logger.warning(f"Contacts cache write failed: {e}")
+
+    async def get_contact(self, key: Optional[str]) -> Optional[ContactResponseSchema]:
+        payload = await self._get(key)
+        if payload is None:
+            return None
+        return ContactResponseSchema.model_validate_json(payload)
+
+    async def set_contact(self, key: Optional[str], contact: Contact) -> None:
+        payload = ContactResponseSchema.model_validate(contact).model_dump_json()
+        await self._set(key, payload.encode())
+
+    async def get_contacts(self, key: Optional[str]) -> Optional[bytes]:
+        # Lists are cached as the encoded response body and sent as is.
+        return await self._get(key)
+
+    async def set_contacts(self, key: Optional[str], payload: bytes) -> None:
+        await self._set(key, payload)
+
+    async def get_page(
+        self, key: Optional[str]
+    ) -> Optional[tuple[bytes, Optional[int]]]:
+        # A page entry is "<next id>\n<body>"; orjson never emits a raw
+        # newline, so the first one always ends the header.
+        entry = await self._get(key)
+        if entry is None:
+            return None
+        header, _, payload = entry.partition(b"\n")
+        return payload, int(header) if header else None
+
+    async def set_page(
+        self, key: Optional[str], payload: bytes, next_id: Optional[int]
+    ) -> None:
+        header = b"" if next_id is None else str(next_id).encode()
+        await self._set(key, header + b"\n" + payload)
+
+    async def invalidate(self, user_id: int) -> None:
+        self._versions.pop(user_id, None)
+        try:
+            await redis_client.eval(
+                BUMP_VERSION_SCRIPT,
+                1,
+                self._version_key(user_id),
+                time.time_ns() // 1000,
+            )
+        except RedisError as e:
+            logger.error(f"Contacts cache invalidation failed for user {user_id}: {e}")
@@ -0,0 +1,71 @@
+import csv
+import io
+import zlib
+from typing import AsyncIterator, Literal
+
+from src.conf.config import settings
+from src.controlllers.contacts_controllers import ContactController
+from src.database.db import session_manager
+from src.schemas.contact_schemas import ContactResponseSchema
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_FIELDS = list(ContactResponseSchema.model_fields)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class ContactExportService:
+    def __init__(self, file_format: ExportFormat = "ndjson", compress: bool = False):
+        self.file_format = file_format
+        self.compress = compress
+        self.chunk_size = settings.CONTACTS_EXPORT_CHUNK_SIZE
+
+    @property
+    def media_type(self) -> str:
+        return "application/gzip" if self.compress else MEDIA_TYPES[self.file_format]
+
+    @property
+    def filename(self) -> str:
+        suffix = ".gz" if self.compress else ""
+        return f"contacts.{self.file_format}{suffix}"
+
+    def _encode(self, contacts: list) -> bytes:
+        rows = [ContactResponseSchema.model_validate(c) for c in contacts]
+        if self.file_format == "ndjson":
+            return b"".join(row.model_dump_json().encode() + b"\n" for row in rows)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writerows(row.model_dump(mode="json") for row in rows)
+        return buffer.getvalue().encode()
+
+    def _header(self) -> bytes:
+        if self.file_format != "csv":
+            return b""
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS).writeheader()
+        return buffer.getvalue().encode()
+
+    async def _iter_chunks(self, user_id: int) -> AsyncIterator[bytes]:
+        yield self._header()
+        # The request-scoped session is closed before a streaming body is
+        # sent, so the export holds its own session for the whole stream.
+        async with session_manager.session() as session:
+            contacts = await ContactController(session).stream_contacts(
+                user_id, self.chunk_size
+            )
+            async for partition in contacts.partitions(self.chunk_size):
+                yield self._encode(partition)
+
+    async def export_contacts(self, user_id: int) -> AsyncIterator[bytes]:
+        if not self.compress:
+            async for chunk in self._iter_chunks(user_id):
+                if chunk:
+                    yield chunk
+            return
+
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+        async for chunk in self._iter_chunks(user_id):
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
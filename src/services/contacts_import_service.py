@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Iterator, Literal
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.controlllers.contacts_controllers import ContactController
+from src.models.models_contacts import User
+from src.schemas.contact_schemas import (
+    ContactSchema,
+    ContactImportErrorSchema,
+    ContactImportReportSchema,
+)
+from src.services.contacts_cache_service import ContactCacheService
+
+ImportFormat = Literal["csv", "ndjson"]
+
+
+def detect_format(file: UploadFile) -> ImportFormat:
+    filename = (file.filename or "").lower()
+    content_type = (file.content_type or "").lower()
+    if filename.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type:
+        return "ndjson"
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Upload a .csv or .ndjson file or pass format explicitly",
+    )
+
+
+def iter_rows(
+    text: io.TextIOBase, file_format: ImportFormat
+) -> Iterator[tuple[int, dict | Exception]]:
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {k: v or None for k, v in row.items() if k}
+        return
+
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_num, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if not isinstance(row, dict):
+            row = ValueError("Each line must be a JSON object")
+        yield line_num, row
+
+
+class ContactImportService:
+    def __init__(self, db: AsyncSession):
+        self.contact_controller = ContactController(db)
+        self.contact_cache = ContactCacheService()
+        self.batch_size = settings.CONTACTS_IMPORT_BATCH_SIZE
+        self.max_reported_errors = settings.CONTACTS_IMPORT_MAX_REPORTED_ERRORS
+
+    def _report_error(
+        self, report: ContactImportReportSchema, row: int, errors: list[str]
+    ) -> None:
+        if len(report.errors) < self.max_reported_errors:
+            report.errors.append(ContactImportErrorSchema(row=row, errors=errors))
+
+    async def import_contacts(
+        self, file: UploadFile, file_format: ImportFormat, user: User
+    ) -> ContactImportReportSchema:
+        user_id = user.id
+        report = ContactImportReportSchema()
+        text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        rows = iter_rows(text, file_format)
+
+        try:
+            while batch := await run_in_threadpool(
+                lambda: list(islice(rows, self.batch_size))
+            ):
+                await self._import_batch(batch, user_id, report)
+        except (UnicodeDecodeError, csv.Error) as e:
+            # earlier batches are already committed, so say what they did
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "message": f"Could not read file: {e}",
+                    "report": report.model_dump(),
+                },
+            )
+        finally:
+            text.detach()
+            if report.inserted:
+                await self.contact_cache.invalidate(user_id)
+        return report
+
+    async def _import_batch(
+        self,
+        batch: list[tuple[int, dict | Exception]],
+        user_id: int,
+        report: ContactImportReportSchema,
+    ) -> None:
+        valid = []
+        for line_num, data in batch:
+            report.received += 1
+            if isinstance(data, Exception):
+                report.failed += 1
+                self._report_error(report, line_num, [str(data)])
+                continue
+            try:
+                contact = ContactSchema.model_validate(data)
+            except ValidationError as e:
+                report.failed += 1
+                self._report_error(
+                    report,
+                    line_num,
+                    [
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                        for err in e.errors()
+                    ],
+                )
+                continue
+            valid.append((line_num, contact.model_dump()))
+
+        inserted = await self.contact_controller.bulk_create_contacts(
+            [row for _, row in valid], user_id
+        )
+        for line_num, row in valid:
+            if row["email"] in inserted:
+                inserted.discard(row["email"])
+                report.inserted += 1
+            else:
+                report.skipped += 1
+                self._report_error(
+                    report,
+                    line_num,
+                    ["Contact with this email or phone already exists"],
+                )
@@ -1,57 +1,193 @@
+from datetime import date
 from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from src.controlllers.contacts_controllers import ContactController
+from src.core.etag import make_etag
+from src.core.serialization import dump_json
 from src.schemas.contact_schemas import (
     ContactSchema,
     ContactUpdateSchema,
     ContactResponseSchema,
+    ContactBatchUpdateItemSchema,
+    ContactBatchResultSchema,
 )
-from src.models.models_contacts import User
+from src.models.models_contacts import Contact, User
+from src.services.contacts_cache_service import ContactCacheService
+
+NOT_NULL_FIELDS = frozenset(
+    column.name for column in Contact.__table__.columns if not column.nullable
+)
+
+
+def null_fields(values: dict) -> list[str]:
+    return sorted(
+        field
+        for field, value in values.items()
+        if value is None and field in NOT_NULL_FIELDS
+    )
 
 
 class ContactService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, from_replica: bool = False):
         self.contact_controller = ContactController(db)
+        self.contact_cache = ContactCacheService()
+        # A replica can still lag once the read-your-writes pin has expired,
+        # and the cache keys and list ETags name the current version, so
+        # replica results are never cached or served under a list ETag.
+        self.from_replica = from_replica
+        self.served_from_replica = False
+
+    async def _cached_list(self, cache_key: Optional[str], query) -> bytes:
+        contacts = await self.contact_cache.get_contacts(cache_key)
+        if contacts is None:
+            contacts = dump_json(await query())
+            if self.from_replica:
+                self.served_from_replica = True
+            else:
+                await self.contact_cache.set_contacts(cache_key, contacts)
+        if contacts == b"[]":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Contacts not found"
+            )
+        return contacts
 
     async def create_contact(self, contact: ContactSchema, user: User):
+        user_id = user.id
         new_contact = await self.contact_controller.create_contact(contact, user)
         if not new_contact:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Contact not created"
             )
+        await self.contact_cache.invalidate(user_id)
         return new_contact
 
-    async def get_contacts(self, limit: int = 10, offset: int = 0, user: User = None):
-        contacts = await self.contact_controller.get_contacts(limit, offset, user)
-        if not contacts:
+    async def get_contacts(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        user: User = None,
+        after_id: Optional[int] = None,
+    ) -> tuple[bytes, Optional[int]]:
+        """Return the encoded page and the id to continue after, if any."""
+        # page entries carry the next id as well, see get_page
+        cache_key = await self.contact_cache.make_key(
+            user.id, "page", limit, offset, after_id
+        )
+        cached = await self.contact_cache.get_page(cache_key)
+        if cached is None:
+            rows = await self.contact_controller.get_contacts(
+                limit, offset, user, after_id
+            )
+            next_id = rows[-1]["id"] if len(rows) == limit else None
+            cached = dump_json(rows), next_id
+            if self.from_replica:
+                self.served_from_replica = True
+            else:
+                await self.contact_cache.set_page(cache_key, *cached)
+        if cached[0] == b"[]":
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Contacts not found"
             )
-        return contacts
+        return cached
+
+    async def list_etag(self, user: User, kind: str, *params) -> Optional[str]:
+        # Any write bumps the version, so this changes whenever a list could.
+        version = await self.contact_cache.version(user.id)
+        if version is None:
+            return None
+        return make_etag("contacts", user.id, version, kind, *params)
 
     async def get_contact_by_id(self, contact_id: int, user: User):
-        contact = await self.contact_controller.get_contact_by_id(contact_id, user)
-        if not contact:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
-            )
+        cache_key = await self.contact_cache.make_key(user.id, "one", contact_id)
+        contact = await self.contact_cache.get_contact(cache_key)
+        if contact is None:
+            contact = await self.contact_controller.get_contact_by_id(contact_id, user)
+            if not contact:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
+                )
+            if not self.from_replica:
+                await self.contact_cache.set_contact(cache_key, contact)
         return contact
 
     async def update_contact(
         self, contact_id: int, contact: ContactUpdateSchema, user: User
     ):
+        user_id = user.id
+        nulls = null_fields(contact.model_dump(exclude_unset=True))
+        if nulls:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{', '.join(nulls)} cannot be null",
+            )
         update = await self.contact_controller.update_contact(contact_id, contact, user)
         if not update:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
             )
+        await self.contact_cache.invalidate(user_id)
         return update
 
     async def remove_contact(self, contact_id: int, user: User):
-        return await self.contact_controller.remove_contact(contact_id, user)
+        user_id = user.id
+        result = await self.contact_controller.remove_contact(contact_id, user)
+        await self.contact_cache.invalidate(user_id)
+        return result
+
+    async def batch_update_contacts(
+        self, items: list[ContactBatchUpdateItemSchema], user: User
+    ) -> list[ContactBatchResultSchema]:
+        user_id = user.id
+        changes = {}
+        for item in items:
+            if item.id in changes:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Contact {item.id} is listed more than once",
+                )
+            values = item.model_dump(exclude_unset=True, exclude={"id"})
+            if not values:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Contact {item.id} has no fields to update",
+                )
+            nulls = null_fields(values)
+            if nulls:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Contact {item.id}: {', '.join(nulls)} cannot be null",
+                )
+            changes[item.id] = values
+
+        updated = await self.contact_controller.batch_update_contacts(changes, user)
+        if updated:
+            await self.contact_cache.invalidate(user_id)
+        return [
+            ContactBatchResultSchema(
+                id=contact_id,
+                status="updated" if contact_id in updated else "not_found",
+            )
+            for contact_id in changes
+        ]
+
+    async def batch_remove_contacts(
+        self, ids: list[int], user: User
+    ) -> list[ContactBatchResultSchema]:
+        user_id = user.id
+        ids = list(dict.fromkeys(ids))
+        deleted = await self.contact_controller.batch_remove_contacts(ids, user)
+        if deleted:
+            await self.contact_cache.invalidate(user_id)
+        return [
+            ContactBatchResultSchema(
+                id=contact_id,
+                status="deleted" if contact_id in deleted else "not_found",
+            )
+            for contact_id in ids
+        ]
 
     async def search_contacts(
         self,
@@ -59,20 +195,24 @@ class ContactService:
         last_name: Optional[str] = None,
         email: Optional[str] = None,
         user: User = None,
+        q: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0,
     ):
-        contacts = await self.contact_controller.search_contacts(
-            first_name, last_name, email, user
+        cache_key = await self.contact_cache.make_key(
+            user.id, "search", q, first_name, last_name, email, limit, offset
+        )
+        return await self._cached_list(
+            cache_key,
+            lambda: self.contact_controller.search_contacts(
+                first_name, last_name, email, user, q, limit, offset
+            ),
         )
-        if not contacts:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Contacts not found"
-            )
-        return contacts
 
-    async def get_contact_by_birthday(self, user: User):
-        contacts = await self.contact_controller.get_contact_by_birthday(user)
-        if not contacts:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Contacts not found"
-            )
-        return contacts
+    async def get_contact_by_birthday(self, user: User, days: int = 7):
+        today = date.today()
+        cache_key = await self.contact_cache.make_key(user.id, "birthday", today, days)
+        return await self._cached_list(
+            cache_key,
+            lambda: self.contact_controller.get_contact_by_birthday(user, days, today),
+        )
@@ -0,0 +1,96 @@
+import json
+import logging
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from src.conf.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+QUEUE_KEY = "email:queue"
+RETRY_KEY = "email:retry"
+DEAD_KEY = "email:dead"
+
+# Moves retries whose backoff has elapsed back onto the queue atomically, so
+# several workers can run it without double-delivering a job.
+PROMOTE_DUE_SCRIPT = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, item in ipairs(items) do
+    redis.call('ZREM', KEYS[1], item)
+    redis.call('LPUSH', KEYS[2], item)
+end
+return #items
+"""
+
+
+class EmailQueue:
+    """Reliable Redis email queue.
+
+    Jobs are LPUSHed onto ``email:queue`` and claimed with BLMOVE into a
+    per-worker processing list, so a job is only dropped from Redis once it
+    has been sent, rescheduled in ``email:retry`` or dead-lettered.
+    """
+
+    def __init__(self, redis: Redis, worker_id: str = "api"):
+        self.redis = redis
+        self.processing_key = f"email:processing:{worker_id}"
+        self._promote_due = redis.register_script(PROMOTE_DUE_SCRIPT)
+
+    async def enqueue(self, kind: str, **data) -> None:
+        job = {"kind": kind, "attempts": 0, "data": data}
+        await self.redis.lpush(QUEUE_KEY, json.dumps(job))
+
+    async def recover(self) -> int:
+        recovered = 0
+        while await self.redis.lmove(self.processing_key, QUEUE_KEY, "RIGHT", "LEFT"):
+            recovered += 1
+        return recovered
+
+    async def promote_due(self, limit: int = 100) -> int:
+        return await self._promote_due(
+            keys=[RETRY_KEY, QUEUE_KEY], args=[time.time(), limit]
+        )
+
+    async def claim_batch(self, size: int, timeout: float) -> list[bytes]:
+        raw = await self.redis.blmove(
+            QUEUE_KEY, self.processing_key, timeout, "RIGHT", "LEFT"
+        )
+        if raw is None:
+            return []
+        batch = [raw]
+        while len(batch) < size:
+            raw = await self.redis.lmove(
+                QUEUE_KEY, self.processing_key, "RIGHT", "LEFT"
+            )
+            if raw is None:
+                break
+            batch.append(raw)
+        return batch
+
+    async def ack(self, raw: bytes) -> None:
+        await self.redis.lrem(self.processing_key, 1, raw)
+
+    async def retry(self, raw: bytes, job: dict, error: str) -> None:
+        job["attempts"] += 1
+        job["error"] = error
+        if job["attempts"] >= settings.EMAIL_MAX_ATTEMPTS:
+            await self.dead_letter(raw, job, error)
+            return
+        delay = min(
+            settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1), 3600
+        )
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(RETRY_KEY, {json.dumps(job): time.time() + delay})
+            pipe.lrem(self.processing_key, 1, raw)
+            await pipe.execute()
+
+    async def dead_letter(self, raw: bytes, job: Optional[dict], error: str) -> None:
+        entry = {"job": job if job is not None else raw.decode(errors="replace")}
+        entry["error"] = error
+        logger.error(f"Email job dead-lettered: {error}")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(DEAD_KEY, json.dumps(entry))
+            pipe.lrem(self.processing_key, 1, raw)
+            await pipe.execute()
@@ -0,0 +1,71 @@
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, nodes, select_autoescape
+from markupsafe import escape
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+
+class CompiledTemplate:
+    """A template compiled once, with its static text split out when possible.
+
+    Templates that only interpolate plain variables (no tags, filters or
+    attribute lookups) are reduced to a list of literal chunks and variable
+    names, so rendering is a join with the values, escaped when the template
+    is autoescaped. Anything else falls back to the compiled Jinja template.
+    """
+
+    def __init__(self, env: Environment, name: str):
+        self.name = name
+        self.template: Template = env.get_template(name)
+        autoescape = env.autoescape
+        self.autoescape = autoescape(name) if callable(autoescape) else autoescape
+        source = env.loader.get_source(env, name)[0]
+        self.parts = self._split(env.parse(source))
+
+    @staticmethod
+    def _split(ast: nodes.Template) -> Optional[list[tuple[bool, str]]]:
+        parts = []
+        for node in ast.body:
+            if not isinstance(node, nodes.Output):
+                return None
+            for child in node.nodes:
+                if isinstance(child, nodes.TemplateData):
+                    parts.append((False, child.data))
+                elif isinstance(child, nodes.Name):
+                    parts.append((True, child.name))
+                else:
+                    return None
+        return parts
+
+    def render(self, context: dict[str, Any]) -> str:
+        if self.parts is None:
+            return self.template.render(context)
+        convert = escape if self.autoescape else str
+        return "".join(
+            convert(context.get(value, "")) if is_var else value
+            for is_var, value in self.parts
+        )
+
+
+class EmailTemplates:
+    def __init__(self, folder: Path = TEMPLATE_FOLDER):
+        self.env = Environment(
+            loader=FileSystemLoader(folder),
+            autoescape=select_autoescape(["html"]),
+        )
+        self.templates = {
+            name: CompiledTemplate(self.env, name)
+            for name in self.env.list_templates(extensions=["html", "txt"])
+        }
+
+    def render(self, name: str, /, **context: Any) -> str:
+        return self.templates[name].render(context)
+
+    def render_many(self, name: str, contexts: Iterable[dict[str, Any]]) -> list[str]:
+        template = self.templates[name]
+        return [template.render(context) for context in contexts]
+
+
+email_templates = EmailTemplates()
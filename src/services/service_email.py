@@ -1,37 +1,90 @@
-from pathlib import Path
+import logging
+from email.message import EmailMessage
+from email.utils import formataddr
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+import aiosmtplib
+from fastapi import HTTPException, status
 from pydantic import EmailStr
+from redis.exceptions import RedisError
 
 from src.conf.config import settings
 from src.core.email_token import create_email_token
+from src.database.redis_client import redis_client
+from src.services.email_queue_service import EmailQueue
+from src.services.email_templates import email_templates
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
-)
-
-
-async def send_email(email: EmailStr, username: str, host: str):
+logger = logging.getLogger("uvicorn.error")
+
+email_queue = EmailQueue(redis_client)
+
+
+async def enqueue_verify_email(
+    email: EmailStr,
+    username: str,
+    host: str,
+    failure_detail: str = "Could not send the confirmation email, try again later",
+):
+    # A dropped verification email leaves the account unusable, so a queue
+    # failure is reported to the caller instead of being swallowed.
     try:
-        token_verify = create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Email confirmation",
-            recipients=[email],
-            template_body={"username": username, "token": token_verify, "host": host},
-            subtype=MessageType.html,
+        await email_queue.enqueue(
+            "verify_email", email=str(email), username=username, host=host
+        )
+    except RedisError as e:
+        logger.error(f"Could not queue verification email for {email}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=failure_detail
         )
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="verify_email.html")
-    except ConnectionErrors as e:
-        print(e)
+
+
+def build_verify_email(email: str, username: str, host: str) -> EmailMessage:
+    token_verify = create_email_token({"sub": email})
+    html = email_templates.render(
+        "verify_email.html", username=username, token=token_verify, host=host
+    )
+    message = EmailMessage()
+    message["Subject"] = "Email confirmation"
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = email
+    message.set_content(html, subtype="html")
+    return message
+
+
+MESSAGE_BUILDERS = {"verify_email": build_verify_email}
+
+
+class SMTPSender:
+    """Keeps one SMTP connection open across a batch of messages."""
+
+    def __init__(self):
+        self._smtp: aiosmtplib.SMTP | None = None
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            validate_certs=settings.VALIDATE_CERTS,
+        )
+        await smtp.connect()
+        if settings.USE_CREDENTIALS:
+            await smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        return smtp
+
+    async def send(self, message: EmailMessage) -> None:
+        if self._smtp is None or not self._smtp.is_connected:
+            self._smtp = await self._connect()
+        try:
+            await self._smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            self._smtp = await self._connect()
+            await self._smtp.send_message(message)
+
+    async def close(self) -> None:
+        if self._smtp is not None and self._smtp.is_connected:
+            try:
+                await self._smtp.quit()
+            except aiosmtplib.SMTPException:
+                self._smtp.close()
+        self._smtp = None
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.controlllers.refresh_token_controller import RefreshTokenController
+from src.database.db import session_manager
+from src.database.redis_client import redis_client
+
+logger = logging.getLogger("uvicorn.error")
+
+CLEANUP_LOCK_KEY = "lock:refresh_tokens_cleanup"
+
+# Deletes the lock only if this run still owns it, so a failed run that
+# overshot the lock TTL cannot release a lock another instance has taken since.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class CleanupReport:
+    deleted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    complete: bool = False
+
+
+async def _release_lock(owner: str) -> None:
+    try:
+        await redis_client.eval(RELEASE_LOCK_SCRIPT, 1, CLEANUP_LOCK_KEY, owner)
+    except RedisError as e:
+        logger.warning(f"Could not release refresh token cleanup lock: {e}")
+
+
+async def cleanup_expired_tokens(
+    batch_size: int = settings.TOKEN_CLEANUP_BATCH_SIZE,
+    max_seconds: float = settings.TOKEN_CLEANUP_MAX_SECONDS,
+    pause_seconds: float = settings.TOKEN_CLEANUP_PAUSE_SECONDS,
+    interval_minutes: int = settings.TOKEN_CLEANUP_INTERVAL_MINUTES,
+) -> Optional[CleanupReport]:
+    """Delete expired and long-revoked refresh tokens in bounded batches.
+
+    Every API process schedules this job; the first one to fire in an
+    interval takes a Redis lock and keeps it for that interval, so the job
+    runs once per interval across all of them. The lock is only released
+    early when the run fails, letting another process retry. Returns None
+    when the lock is held elsewhere.
+    """
+    owner = secrets.token_hex(8)
+    # A little under one interval, so the next trigger in line finds it gone,
+    # but always longer than the longest allowed run plus one slow batch.
+    lock_seconds = max(interval_minutes * 60 - 30, int(max_seconds) + 60)
+    try:
+        acquired = await redis_client.set(
+            CLEANUP_LOCK_KEY, owner, nx=True, ex=lock_seconds
+        )
+    except RedisError as e:
+        logger.warning(f"Skipping refresh token cleanup, lock unavailable: {e}")
+        return None
+    if not acquired:
+        return None
+
+    report = CleanupReport()
+    started_at = time.monotonic()
+    time_now = datetime.now(timezone.utc)
+    revoked_before = time_now - timedelta(days=settings.TOKEN_CLEANUP_REVOKED_DAYS)
+    try:
+        while time.monotonic() - started_at < max_seconds:
+            async with session_manager.session() as session:
+                deleted = await RefreshTokenController(session).delete_expired_batch(
+                    time_now, revoked_before, batch_size
+                )
+            report.deleted += deleted
+            report.batches += 1
+            if deleted < batch_size:
+                report.complete = True
+                break
+            await asyncio.sleep(pause_seconds)
+    except BaseException:
+        await _release_lock(owner)
+        raise
+    finally:
+        report.seconds = time.monotonic() - started_at
+
+    logger.info(
+        f"Refresh token cleanup deleted {report.deleted} rows in "
+        f"{report.batches} batches, {report.seconds:.2f}s"
+        + ("" if report.complete else ", stopped at time limit")
+    )
+    return report
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.core.bloom_filter import BloomFilter
+from src.database.redis_client import redis_client
+
+logger = logging.getLogger("uvicorn.error")
+
+REVOKED_INDEX_KEY = "bl:jtis"
+REVOKED_CHANNEL = "bl:revoked"
+
+
+class TokenRevocationService:
+    """Revoked access tokens, by ``jti``, with an in-process Bloom filter.
+
+    Redis stays the source of truth: one ``bl:{jti}`` key per revoked token
+    plus a sorted set of all of them scored by expiry, which is what a fresh
+    process loads its filter from. Revocations are announced on a pub/sub
+    channel so every process adds them to its filter straight away.
+
+    While the filter is in sync a miss is final and costs no Redis call; only
+    possible hits are confirmed against Redis. Whenever the subscription is
+    down every check goes to Redis.
+    """
+
+    def __init__(
+        self,
+        client=redis_client,
+        capacity: int = settings.REVOCATION_FILTER_CAPACITY,
+        error_rate: float = settings.REVOCATION_FILTER_ERROR_RATE,
+        rebuild_seconds: int = settings.REVOCATION_FILTER_REBUILD_SECONDS,
+    ):
+        self.client = client
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_seconds = rebuild_seconds
+        self._filter = BloomFilter(capacity, error_rate)
+        self._task: Optional[asyncio.Task] = None
+        self.synced = False
+        self.checks = 0
+        self.redis_lookups = 0
+        self.false_positives = 0
+
+    @staticmethod
+    def _key(jti: str) -> str:
+        return f"bl:{jti}"
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+        self._filter.add(jti)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(jti), 1, ex=ttl)
+            pipe.zadd(REVOKED_INDEX_KEY, {jti: expires_at})
+            pipe.publish(REVOKED_CHANNEL, jti)
+            await pipe.execute()
+
+    async def is_revoked(self, jti: str) -> bool:
+        self.checks += 1
+        if self.synced and jti not in self._filter:
+            return False
+        self.redis_lookups += 1
+        revoked = bool(await self.client.exists(self._key(jti)))
+        if self.synced and not revoked:
+            self.false_positives += 1
+        return revoked
+
+    async def reload(self) -> None:
+        # Bloom filters cannot forget, so expired tokens are dropped by
+        # rebuilding from the index and swapping the new filter in.
+        now = time.time()
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(REVOKED_INDEX_KEY, "-inf", now)
+            pipe.zrange(REVOKED_INDEX_KEY, 0, -1)
+            _, jtis = await pipe.execute()
+        rebuilt = BloomFilter(max(self.capacity, len(jtis) * 2), self.error_rate)
+        for jti in jtis:
+            rebuilt.add(jti.decode())
+        self._filter = rebuilt
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    # subscribe before loading so nothing published in between
+                    # is missed
+                    await pubsub.subscribe(REVOKED_CHANNEL)
+                    await self.reload()
+                    self.synced = True
+                    rebuild_at = time.monotonic() + self.rebuild_seconds
+                    while True:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0
+                        )
+                        if message is not None:
+                            self._filter.add(message["data"].decode())
+                        if time.monotonic() >= rebuild_at:
+                            await self.reload()
+                            rebuild_at = time.monotonic() + self.rebuild_seconds
+            except (RedisError, OSError) as e:
+                self.synced = False
+                logger.warning(f"Revocation filter out of sync: {e}")
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                self.synced = False
+                raise
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> dict:
+        return {
+            "synced": self.synced,
+            "entries": self._filter.count,
+            "checks": self.checks,
+            "redis_lookups": self.redis_lookups,
+            "false_positives": self.false_positives,
+        }
+
+
+token_revocation = TokenRevocationService()
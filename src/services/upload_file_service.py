@@ -1,8 +1,34 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Optional
+
 import cloudinary
 import cloudinary.uploader
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps, UnidentifiedImageError
 
+from src.conf.config import settings
 
-class UploadFileService:
+logger = logging.getLogger("uvicorn.error")
+
+ALLOWED_IMAGE_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+# room for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+
+class StorageBackend(ABC):
+    @abstractmethod
+    async def save(self, path: str, public_id: str) -> str: ...
+
+
+class CloudinaryStorage(StorageBackend):
     def __init__(self, cloud_name, api_key, api_secret):
         self.cloud_name = cloud_name
         self.api_key = api_key
@@ -12,10 +38,10 @@ class UploadFileService:
             cloud_name=self.cloud_name, api_key=self.api_key, api_secret=self.api_secret
         )
 
-    @staticmethod
-    def upload_file(file, username):
-        public_id = f"Restapi/{username}"
-        r = cloudinary.uploader.upload(file, public_id=public_id, overwrite=True)
+    async def save(self, path: str, public_id: str) -> str:
+        r = await run_in_threadpool(
+            cloudinary.uploader.upload, path, public_id=public_id, overwrite=True
+        )
         src_url = cloudinary.CloudinaryImage(public_id).build_url(
             width=250,
             height=250,
@@ -25,3 +51,107 @@ class UploadFileService:
             version=r.get("version"),
         )
         return src_url
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    @staticmethod
+    def _copy(path: str, target: Path) -> str:
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()[:12]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+        return digest
+
+    async def save(self, path: str, public_id: str) -> str:
+        target = (self.root / f"{public_id}.png").resolve()
+        if not target.is_relative_to(self.root):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid avatar path",
+            )
+        digest = await run_in_threadpool(self._copy, path, target)
+        # the file name is reused, so the content hash busts browser caches
+        return f"{self.base_url}/{public_id}.png?v={digest}"
+
+
+def get_storage() -> StorageBackend:
+    if settings.AVATAR_STORAGE == "local":
+        return LocalStorage(settings.AVATAR_LOCAL_DIR, settings.AVATAR_LOCAL_BASE_URL)
+    return CloudinaryStorage(
+        settings.CLD_NAME, settings.CLD_API_KEY, settings.CLD_API_SECRET
+    )
+
+
+def prepare_image(source: BinaryIO, target: str, max_dimension: int) -> None:
+    try:
+        source.seek(0)
+        with Image.open(source) as image:
+            if image.format not in ALLOWED_IMAGE_FORMATS:
+                raise HTTPException(
+                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    detail="Avatar must be a JPEG, PNG, WEBP or GIF image",
+                )
+            image.verify()
+        # verify() leaves the image unusable, so it is opened again to resize
+        source.seek(0)
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_dimension, max_dimension))
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            image.save(target, format="PNG", optimize=True)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Avatar is not a valid image",
+        )
+
+
+class UploadFileService:
+    def __init__(
+        self,
+        storage: StorageBackend,
+        max_bytes: int = settings.AVATAR_MAX_BYTES,
+        max_dimension: int = settings.AVATAR_MAX_DIMENSION,
+        max_concurrency: int = settings.AVATAR_UPLOAD_CONCURRENCY,
+    ):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.max_dimension = max_dimension
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Avatar must not exceed {self.max_bytes} bytes",
+        )
+
+    def check_content_length(self, content_length: Optional[str]) -> None:
+        # Runs before the multipart body is read, so oversized uploads are
+        # refused without being received; chunked ones are caught by size.
+        if content_length is None or not content_length.isdigit():
+            return
+        if int(content_length) > self.max_bytes + MULTIPART_OVERHEAD_BYTES:
+            raise self._too_large()
+
+    async def upload_file(self, file: UploadFile, user_id: int) -> str:
+        if file.size is not None and file.size > self.max_bytes:
+            raise self._too_large()
+        # keyed on the id, which unlike the username is never user supplied
+        public_id = f"Restapi/{user_id}"
+        async with self._semaphore:
+            with tempfile.TemporaryDirectory(prefix="avatar-") as workdir:
+                # Starlette has already spooled the upload, so it is read
+                # from there rather than copied again
+                target = os.path.join(workdir, "avatar.png")
+                await run_in_threadpool(
+                    prepare_image, file.file, target, self.max_dimension
+                )
+                return await self.storage.save(target, public_id)
+
+
+upload_file_service = UploadFileService(get_storage())
@@ -0,0 +1,125 @@
+import json
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.core.ttl_cache import TTLCache
+from src.database.redis_client import redis_client
+from src.models.models_contacts import User
+from src.services.contacts_cache_service import BUMP_VERSION_SCRIPT
+
+logger = logging.getLogger("uvicorn.error")
+
+CACHED_USER_FIELDS = ("id", "username", "email", "avatar", "confirmed")
+
+local_user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_LOCAL_MAXSIZE,
+    ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS,
+)
+
+
+# Reads the user's version, seeding it like BUMP_VERSION_SCRIPT when missing,
+# and the entry stored under that version, in one round trip.
+GET_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[2], 'NX')
+local version = redis.call('GET', KEYS[1])
+return {version, redis.call('GET', ARGV[1] .. version)}
+"""
+
+# Stores an entry only if no invalidation happened since its row was read.
+SET_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class UserCacheService:
+    """Two-tier cache of the authenticated user, keyed by username.
+
+    Hits are rebuilt as transient ``User`` objects that are never attached to
+    a session, so they are safe to share between requests. The hash of the
+    password is deliberately not cached.
+
+    Redis entries are keyed by a per-user version that ``invalidate`` bumps.
+    ``set`` only writes if the version read by ``get`` is still current, so a
+    row read from the database before a concurrent update cannot be put back
+    after that update invalidated it.
+    """
+
+    def __init__(self, ttl: int = settings.USER_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._versions: dict[str, int] = {}
+
+    @staticmethod
+    def _version_key(username: str) -> str:
+        return f"user:ver:{username}"
+
+    @staticmethod
+    def _key_prefix(username: str) -> str:
+        return f"user:{username}:v"
+
+    async def get(self, username: str) -> Optional[User]:
+        data = local_user_cache.get(username)
+        if data is None:
+            try:
+                version, payload = await redis_client.eval(
+                    GET_SCRIPT,
+                    1,
+                    self._version_key(username),
+                    self._key_prefix(username),
+                    time.time_ns() // 1000,
+                )
+            except RedisError as e:
+                logger.warning(f"User cache read failed: {e}")
+                return None
+            self._versions[username] = int(version)
+            if payload is None:
+                return None
+            data = json.loads(payload)
+            local_user_cache.set(username, data)
+        return User(**data)
+
+    async def set(self, user: User) -> None:
+        # without the version seen before the database read there is no way
+        # to tell whether the row is still current
+        version = self._versions.get(user.username)
+        if version is None:
+            return
+        data = {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+        # set locally first: an invalidation racing the write below then
+        # either pops this entry or makes the write fail and pop it here
+        local_user_cache.set(user.username, data)
+        try:
+            stored = await redis_client.eval(
+                SET_SCRIPT,
+                2,
+                self._version_key(user.username),
+                f"{self._key_prefix(user.username)}{version}",
+                version,
+                json.dumps(data),
+                self.ttl,
+            )
+        except RedisError as e:
+            logger.warning(f"User cache write failed: {e}")
+            stored = 0
+        if not stored:
+            local_user_cache.pop(user.username)
+
+    async def invalidate(self, username: str) -> None:
+        local_user_cache.pop(username)
+        self._versions.pop(username, None)
+        try:
+            await redis_client.eval(
+                BUMP_VERSION_SCRIPT,
+                1,
+                self._version_key(username),
+                time.time_ns() // 1000,
+            )
+        except RedisError as e:
+            logger.error(f"User cache invalidation failed for {username}: {e}")
@@ -1,16 +1,27 @@
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.controlllers.user_conrollers import UserController
 from src.schemas.user_schemas import UserCreateSchema
-from src.services.auth_service import AuthService, oauth2_scheme
+from src.services.auth_service import AuthService
 from src.models.models_contacts import User
+from src.services.user_cache_service import UserCacheService
 
 
 class UserService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, auth_service: Optional[AuthService] = None):
         self.db = db
         self.user_controller = UserController(self.db)
-        self.auth_service = AuthService(self.db)
+        self._auth_service = auth_service
+        self.user_cache = UserCacheService()
+
+    @property
+    def auth_service(self) -> AuthService:
+        # only create_user needs it, so it is not built up front
+        if self._auth_service is None:
+            self._auth_service = AuthService(self.db)
+        return self._auth_service
 
     async def create_user(self, user: UserCreateSchema) -> User | None:
         user = await self.auth_service.register_user(user)
@@ -26,7 +37,12 @@ class UserService:
 
     async def confirmed_email(self, email: str) -> None:
         user = await self.user_controller.confirmed_email(email=email)
+        if user:
+            await self.user_cache.invalidate(user.username)
         return user
 
     async def update_avatar(self, email: str, url: str) -> User:
-        return await self.user_controller.update_avatar(email=email, url=url)
+        user = await self.user_controller.update_avatar(email=email, url=url)
+        if user:
+            await self.user_cache.invalidate(user.username)
+        return user
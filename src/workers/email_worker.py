@@ -0,0 +1,82 @@
+"""Delivers queued emails. Run one or more alongside the API:
+
+python -m src.workers.email_worker --worker-id mail-1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import socket
+
+import aiosmtplib
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.services.email_queue_service import EmailQueue
+from src.services.service_email import MESSAGE_BUILDERS, SMTPSender
+
+logger = logging.getLogger("uvicorn.error")
+
+PERMANENT_ERRORS = (aiosmtplib.SMTPRecipientsRefused, aiosmtplib.SMTPSenderRefused)
+
+
+async def process_batch(queue: EmailQueue, sender: SMTPSender, batch: list[bytes]):
+    for raw in batch:
+        try:
+            job = json.loads(raw)
+            message = MESSAGE_BUILDERS[job["kind"]](**job["data"])
+        except (ValueError, KeyError, TypeError) as e:
+            await queue.dead_letter(raw, None, f"Malformed job: {e!r}")
+            continue
+
+        try:
+            await sender.send(message)
+        except PERMANENT_ERRORS as e:
+            await queue.dead_letter(raw, job, repr(e))
+        except (aiosmtplib.SMTPException, OSError) as e:
+            logger.warning(f"Email to {message['To']} failed, will retry: {e!r}")
+            await sender.close()
+            await queue.retry(raw, job, repr(e))
+        else:
+            await queue.ack(raw)
+
+
+async def run(worker_id: str) -> None:
+    queue = EmailQueue(redis_client, worker_id)
+    sender = SMTPSender()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    recovered = await queue.recover()
+    if recovered:
+        logger.info(f"Requeued {recovered} unfinished email jobs")
+
+    while not stop.is_set():
+        await queue.promote_due()
+        batch = await queue.claim_batch(
+            settings.EMAIL_BATCH_SIZE, settings.EMAIL_POLL_SECONDS
+        )
+        if not batch:
+            # Idle: don't hold the SMTP connection open between bursts.
+            await sender.close()
+            continue
+        await process_batch(queue, sender, batch)
+
+    await sender.close()
+    await redis_client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Email delivery worker")
+    parser.add_argument("--worker-id", default=socket.gethostname())
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.worker_id))
+
+
+if __name__ == "__main__":
+    main()